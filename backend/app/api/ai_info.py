@@ -1,17 +1,33 @@
-from fastapi import APIRouter, HTTPException, Response
-from typing import List
-import json
+from fastapi import APIRouter, HTTPException, Response, Query, BackgroundTasks, Depends
+from typing import Dict, List, Union
+from datetime import datetime, timedelta
 import feedparser
 import re
 import html
 from deep_translator import GoogleTranslator
 
-from ..firebase_db import get_collection, get_document
-from ..firebase_models import FirebaseAIInfo
-from ..schemas import AIInfoCreate, AIInfoResponse, AIInfoItem, TermItem
+from ..cache import TieredCache
+from ..firebase_db import get_collection, get_document, get_documents, get_firestore_client
+from ..firebase_models import AI_INFO_ITEMS, FirebaseAIInfo, FirebaseAIInfoItem
+from ..quiz_generator import build_quiz_pool, invalidate_quiz_pool
+from ..recommender import related_index, ai_info_key, ai_info_date_prefix, ai_info_document
+from ..schemas import AIInfoCreate, AIInfoResponse, AIInfoItem, AIInfoSummary, TermItem
+from ..term_index import term_index
+from ..term_linker import term_linker
+from ..single_flight import single_flight
+from ..threadpool import route_limit
 
 router = APIRouter()
 
+VIEWS = ("full", "summary")
+MAX_RANGE_DAYS = 92
+
+# 날짜별 조회 결과 캐시 (키: (날짜, view))
+_date_cache = TieredCache('ai_info_date', maxsize=1024, ttl=300)
+
+# 날짜별 항목 수 (전체 컨텐츠 카탈로그)
+_catalogue_cache = TieredCache('ai_info_catalogue', maxsize=1, ttl=300)
+
 def translate_to_ko(text):
     try:
         return GoogleTranslator(source='auto', target='ko').translate(text)
@@ -32,61 +48,199 @@ def normalize_text(text):
     text = re.sub(r'\s+', '', text)
     return text
 
-@router.get("/{date}", response_model=List[AIInfoItem])
-def get_ai_info_by_date(date: str):
-    """특정 날짜의 AI 정보 조회"""
-    try:
-        # Firebase에서 해당 날짜의 AI 정보 조회
-        ai_info_ref = get_document('ai_info', date)
-        if not ai_info_ref:
-            return []
-        
+def _item_refs(date: str):
+    """날짜별 항목 하위 컬렉션 참조"""
+    ai_info_ref = get_document('ai_info', date)
+    if not ai_info_ref:
+        return None
+    return ai_info_ref.collection(AI_INFO_ITEMS)
+
+def _load_ai_info(date: str, view: str) -> list:
+    """Firestore에서 특정 날짜의 AI 정보 조회"""
+    ai_info_ref = get_document('ai_info', date)
+    if not ai_info_ref:
+        return []
+    
+    if view == "summary":
         doc = ai_info_ref.get()
         if not doc.exists:
             return []
+        return FirebaseAIInfo.from_dict(doc.to_dict()).summaries
+    
+    # 항목 하위 컬렉션에서 본문 조회
+    item_docs = list(ai_info_ref.collection(AI_INFO_ITEMS).order_by('index').stream())
+    if item_docs:
+        return [FirebaseAIInfoItem.from_dict(item_doc.to_dict()).to_dict() for item_doc in item_docs]
+    
+    # 기존 형식(info1..info3가 문서 안에 있는 경우)
+    doc = ai_info_ref.get()
+    if not doc.exists:
+        return []
+    ai_info = FirebaseAIInfo.from_dict(doc.to_dict())
+    return [item.to_dict() for item in ai_info.items]
+
+def _with_related(date: str, infos: list, view: str) -> list:
+    """미리 계산된 관련 항목 추가 (메모리 조회만 수행)"""
+    if view != "full":
+        return infos
+    return [{**info, 'related': related_index.related(ai_info_key(date, info['index']))} for info in infos]
+
+def _index_related(items: List[FirebaseAIInfoItem]):
+    for item in items:
+        document = ai_info_document(item)
+        related_index.upsert(document['key'], document['meta'], document['text'])
+
+def _invalidate_date(date: str):
+    for view in VIEWS:
+        _date_cache.delete((date, view))
+    _catalogue_cache.clear()
+
+def get_item_counts() -> Dict[str, int]:
+    """날짜별 AI 정보 항목 수 (요약 필드만 projection으로 조회 후 캐시)"""
+    counts = _catalogue_cache.get('counts')
+    if counts is not None:
+        return counts
+    
+    ai_info_collection = get_collection('ai_info')
+    if not ai_info_collection:
+        return {}
+    
+    counts = {}
+    legacy_titles = [f'info{n}_title' for n in (1, 2, 3)]
+    for doc in ai_info_collection.select(['item_count'] + legacy_titles).stream():
+        data = doc.to_dict()
+        if 'item_count' in data:
+            counts[doc.id] = data['item_count']
+        else:
+            # 기존 형식은 제목이 있는 칸 수로 계산
+            counts[doc.id] = sum(1 for field in legacy_titles if data.get(field))
+    _catalogue_cache.set('counts', counts)
+    return counts
+
+def _date_span(start: str, end: str) -> List[str]:
+    """시작일부터 종료일까지의 날짜 문자열 목록"""
+    start_date = datetime.strptime(start, "%Y-%m-%d").date()
+    end_date = datetime.strptime(end, "%Y-%m-%d").date()
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    days = (end_date - start_date).days + 1
+    if days > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range must not exceed {MAX_RANGE_DAYS} days")
+    return [(start_date + timedelta(days=offset)).isoformat() for offset in range(days)]
+
+@router.get("/range", response_model=Dict[str, Union[List[AIInfoItem], List[AIInfoSummary]]], dependencies=[Depends(route_limit('scan'))])
+def get_ai_info_range(
+    date_from: str = Query(..., alias="from"),
+    date_to: str = Query(..., alias="to"),
+    view: str = Query("summary", pattern="^(full|summary)$")
+):
+    """기간별 AI 정보 일괄 조회 (날짜를 키로 반환)"""
+    try:
+        dates = _date_span(date_from, date_to)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    
+    try:
+        result = {}
+        missing = []
+        for date in dates:
+            cached = _date_cache.get((date, view))
+            if cached is None:
+                missing.append(date)
+            else:
+                result[date] = cached
         
-        ai_info_data = doc.to_dict()
-        ai_info = FirebaseAIInfo.from_dict(ai_info_data)
-        
-        infos = []
-        if ai_info.info1_title and ai_info.info1_content:
-            try:
-                terms1 = json.loads(ai_info.info1_terms) if ai_info.info1_terms else []
-            except json.JSONDecodeError:
-                terms1 = []
-            infos.append({
-                "title": ai_info.info1_title, 
-                "content": ai_info.info1_content,
-                "terms": terms1
-            })
-        if ai_info.info2_title and ai_info.info2_content:
-            try:
-                terms2 = json.loads(ai_info.info2_terms) if ai_info.info2_terms else []
-            except json.JSONDecodeError:
-                terms2 = []
-            infos.append({
-                "title": ai_info.info2_title, 
-                "content": ai_info.info2_content,
-                "terms": terms2
-            })
-        if ai_info.info3_title and ai_info.info3_content:
-            try:
-                terms3 = json.loads(ai_info.info3_terms) if ai_info.info3_terms else []
-            except json.JSONDecodeError:
-                terms3 = []
-            infos.append({
-                "title": ai_info.info3_title, 
-                "content": ai_info.info3_content,
-                "terms": terms3
-            })
+        if missing:
+            db = get_firestore_client()
+            if not db:
+                return result
+            fetched = {date: [] for date in missing}
+            
+            if view == "full":
+                # 컬렉션 그룹 쿼리 한 번으로 기간 내 항목 조회 (ai_info_items.date 인덱스 필요)
+                item_docs = (
+                    db.collection_group(AI_INFO_ITEMS)
+                    .where('date', '>=', missing[0])
+                    .where('date', '<=', missing[-1])
+                    .stream()
+                )
+                for item_doc in item_docs:
+                    item = FirebaseAIInfoItem.from_dict(item_doc.to_dict())
+                    if item.date in fetched:
+                        fetched[item.date].append(item)
+                for date, items in fetched.items():
+                    fetched[date] = [item.to_dict() for item in sorted(items, key=lambda item: item.index)]
+            
+            # 요약 문서(및 기존 형식 문서)는 get_all 한 번으로 조회
+            need_parent = [date for date in missing if view == "summary" or not fetched[date]]
+            if need_parent:
+                refs = [db.collection('ai_info').document(date) for date in need_parent]
+                for doc in get_documents(refs).values():
+                    if not doc.exists:
+                        continue
+                    ai_info = FirebaseAIInfo.from_dict(doc.to_dict())
+                    if view == "summary":
+                        fetched[doc.id] = ai_info.summaries
+                    else:
+                        fetched[doc.id] = [item.to_dict() for item in ai_info.items]
+            
+            for date, value in fetched.items():
+                _date_cache.set((date, view), value)
+                result[date] = value
         
-        return infos
+        return {date: _with_related(date, result[date], view) for date in dates if result.get(date)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in get_ai_info_range: {e}")
+        return {}
+
+@router.get("/{date}", response_model=Union[List[AIInfoItem], List[AIInfoSummary]])
+def get_ai_info_by_date(date: str, view: str = Query("full", pattern="^(full|summary)$")):
+    """특정 날짜의 AI 정보 조회 (view=summary이면 제목과 용어 수만 반환)"""
+    try:
+        infos = _date_cache.get((date, view))
+        if infos is None:
+            infos = _load_ai_info(date, view)
+            _date_cache.set((date, view), infos)
+        return _with_related(date, infos, view)
     except Exception as e:
         print(f"Error in get_ai_info_by_date: {e}")
         return []
 
+@router.get("/{date}/items/{index}", response_model=AIInfoItem)
+def get_ai_info_item(date: str, index: int):
+    """특정 날짜의 AI 정보 항목 1건 조회"""
+    try:
+        items_ref = _item_refs(date)
+        if not items_ref:
+            raise HTTPException(status_code=404, detail="AI info item not found")
+        
+        related = related_index.related(ai_info_key(date, index))
+        # 항목 문서와 기존 형식 날짜 문서를 get_all 한 번으로 조회
+        item_ref = items_ref.document(f"{index:03d}")
+        ai_info_ref = items_ref.parent
+        docs = get_documents([item_ref, ai_info_ref])
+        item_doc = docs[item_ref.path]
+        if item_doc.exists:
+            return {**FirebaseAIInfoItem.from_dict(item_doc.to_dict()).to_dict(), 'related': related}
+        
+        # 기존 형식 문서에서 항목 찾기
+        doc = docs[ai_info_ref.path]
+        if doc.exists:
+            ai_info = FirebaseAIInfo.from_dict(doc.to_dict())
+            if 0 <= index < len(ai_info.items):
+                return {**ai_info.items[index].to_dict(), 'related': related}
+        
+        raise HTTPException(status_code=404, detail="AI info item not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in get_ai_info_item: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get AI info item")
+
 @router.post("/", response_model=AIInfoResponse)
-def add_ai_info(ai_info_data: AIInfoCreate):
+def add_ai_info(ai_info_data: AIInfoCreate, background_tasks: BackgroundTasks):
     """AI 정보 추가"""
     try:
         # Firebase에 AI 정보 저장
@@ -95,28 +249,43 @@ def add_ai_info(ai_info_data: AIInfoCreate):
             raise HTTPException(status_code=500, detail="Database connection failed")
         
         # 기존 데이터 확인
-        existing_doc = ai_info_collection.document(ai_info_data.date).get()
+        ai_info_ref = ai_info_collection.document(ai_info_data.date)
+        existing_doc = ai_info_ref.get()
         if existing_doc.exists:
             raise HTTPException(status_code=400, detail="AI info for this date already exists")
         
+        # 용어 매처 준비 (저장 시점에 본문의 용어 위치를 미리 계산)
+        term_index.ensure_loaded()
+        if not term_linker.built:
+            term_linker.rebuild(term_index.terms())
+        
         # 새 AI 정보 생성
-        firebase_ai_info = FirebaseAIInfo(
+        items = [
+            FirebaseAIInfoItem(
                 date=ai_info_data.date,
-            info1_title=ai_info_data.info1_title,
-            info1_content=ai_info_data.info1_content,
-            info1_terms=json.dumps(ai_info_data.info1_terms) if ai_info_data.info1_terms else None,
-            info2_title=ai_info_data.info2_title,
-            info2_content=ai_info_data.info2_content,
-            info2_terms=json.dumps(ai_info_data.info2_terms) if ai_info_data.info2_terms else None,
-            info3_title=ai_info_data.info3_title,
-            info3_content=ai_info_data.info3_content,
-            info3_terms=json.dumps(ai_info_data.info3_terms) if ai_info_data.info3_terms else None
-        )
+                index=index,
+                title=item.title,
+                content=item.content,
+                terms=[term.model_dump() for term in item.terms or []],
+                links=term_linker.annotate(item.content)
+            )
+            for index, item in enumerate(ai_info_data.collect_items())
+        ]
+        firebase_ai_info = FirebaseAIInfo(date=ai_info_data.date, items=items)
+        
+        # 요약 문서와 항목 문서를 한 번에 저장
+        batch = get_firestore_client().batch()
+        batch.set(ai_info_ref, firebase_ai_info.to_dict())
+        for item in items:
+            batch.set(ai_info_ref.collection(AI_INFO_ITEMS).document(item.doc_id), item.to_dict())
+        batch.commit()
+        _invalidate_date(ai_info_data.date)
         
-        # Firebase에 저장
-        ai_info_collection.document(ai_info_data.date).set(firebase_ai_info.to_dict())
+        # 해당 날짜의 용어로 퀴즈 풀을 백그라운드에서 미리 생성
+        background_tasks.add_task(build_quiz_pool, ai_info_data.date, [item.to_dict() for item in items])
+        background_tasks.add_task(_index_related, items)
         
-            return {
+        return {
             "message": "AI info added successfully",
             "date": ai_info_data.date
         }
@@ -134,7 +303,17 @@ def delete_ai_info(date: str):
         if not ai_info_ref:
             raise HTTPException(status_code=404, detail="AI info not found")
         
-        ai_info_ref.delete()
+        # 항목 하위 컬렉션도 함께 삭제
+        db = get_firestore_client()
+        batch = db.batch()
+        for item_doc in ai_info_ref.collection(AI_INFO_ITEMS).stream():
+            batch.delete(item_doc.reference)
+        batch.delete(ai_info_ref)
+        batch.delete(db.collection('quiz_pool').document(date))
+        batch.commit()
+        _invalidate_date(date)
+        invalidate_quiz_pool(date)
+        related_index.remove_prefix(ai_info_date_prefix(date))
         return {"message": "AI info deleted successfully"}
     except HTTPException:
         raise
@@ -142,9 +321,7 @@ def delete_ai_info(date: str):
         print(f"Error in delete_ai_info: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete AI info")
 
-@router.get("/dates/all")
-def get_all_ai_info_dates():
-    """모든 AI 정보 날짜 조회"""
+def _load_all_dates() -> List[str]:
     try:
         ai_info_collection = get_collection('ai_info')
         if not ai_info_collection:
@@ -157,9 +334,12 @@ def get_all_ai_info_dates():
         print(f"Error in get_all_ai_info_dates: {e}")
         return []
 
-@router.get("/news/fetch")
-def fetch_ai_news():
-    """AI 관련 뉴스 가져오기"""
+@router.get("/dates/all", dependencies=[Depends(route_limit('scan'))])
+async def get_all_ai_info_dates():
+    """모든 AI 정보 날짜 조회 (동시 요청은 스캔 1회를 공유)"""
+    return await single_flight.do(('ai-info', 'dates/all'), _load_all_dates)
+
+def _fetch_news() -> dict:
     try:
         # RSS 피드에서 AI 뉴스 가져오기
         feed = feedparser.parse('https://feeds.feedburner.com/TechCrunch/')
@@ -186,6 +366,11 @@ def fetch_ai_news():
         print(f"Error in fetch_ai_news: {e}")
         return {"news": []}
 
+@router.get("/news/fetch", dependencies=[Depends(route_limit('scan'))])
+async def fetch_ai_news():
+    """AI 관련 뉴스 가져오기 (동시 요청은 피드 조회/번역 1회를 공유)"""
+    return await single_flight.do(('ai-info', 'news/fetch'), _fetch_news)
+
 @router.options("/")
 def options_ai_info():
     """OPTIONS 요청 처리"""
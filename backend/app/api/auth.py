@@ -4,9 +4,10 @@ from datetime import timedelta
 from ..firebase_auth import (
     verify_password, get_password_hash, create_access_token, 
     authenticate_user, get_current_active_user, create_user, 
-    get_all_users, update_user, delete_user, get_user_by_username, ACCESS_TOKEN_EXPIRE_MINUTES
+    iter_users, update_user, delete_user, get_user_by_username, ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from ..firebase_models import FirebaseUser
+from ..projection import Fields, field_selector, select_fields, stream_project
 from ..schemas import UserCreate, UserLogin, UserResponse, Token
 from .logs import log_activity
 
@@ -43,21 +44,21 @@ def register_user(user_data: UserCreate, request: Request):
         
         # 회원가입 로그 기록 (에러 무시)
         try:
-    log_activity(
-        action="회원가입",
-        details=f"새 사용자가 등록되었습니다. 역할: {user_data.role}",
-        log_type="user",
-        log_level="info",
+            log_activity(
+                action="회원가입",
+                details=f"새 사용자가 등록되었습니다. 역할: {user_data.role}",
+                log_type="user",
+                log_level="info",
                 user_id=user_id,
                 username=firebase_user.username,
-        ip_address=request.client.host if request.client else None
-    )
+                ip_address=request.client.host if request.client else None
+            )
         except Exception as log_error:
             print(f"⚠️ 로그 기록 실패 (무시): {log_error}")
         
         # UserResponse 스키마에 맞는 형태로 반환
         return {
-            "id": int(user_id) if user_id.isdigit() else 1,  # Firebase ID를 정수로 변환
+            "id": user_id,
             "username": firebase_user.username,
             "email": firebase_user.email,
             "role": firebase_user.role,
@@ -146,39 +147,39 @@ def login_user(user_credentials: UserLogin, request: Request):
         
         if not user:
             print("❌ 인증 실패")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect username or password",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        # 액세스 토큰 생성
+        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        access_token = create_access_token(
+            data={"sub": user.username}, expires_delta=access_token_expires
         )
-    
-    # 액세스 토큰 생성
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
         print(f"🎫 토큰 생성 완료: {access_token[:20]}...")
     
         # 로그인 로그 기록 (에러 무시)
         try:
-    log_activity(
-        action="로그인",
-        details=f"사용자가 성공적으로 로그인했습니다. 역할: {user.role}",
-        log_type="user",
-        log_level="success",
+            log_activity(
+                action="로그인",
+                details=f"사용자가 성공적으로 로그인했습니다. 역할: {user.role}",
+                log_type="user",
+                log_level="success",
                 user_id=user.user_id,
-        username=user.username,
-        ip_address=request.client.host if request.client else None
-    )
+                username=user.username,
+                ip_address=request.client.host if request.client else None
+            )
         except Exception as log_error:
             print(f"⚠️ 로그 기록 실패 (무시): {log_error}")
-    
+        
         print("✅ 로그인 성공")
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": user
-    }
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "user": user
+        }
         
     except HTTPException:
         raise
@@ -195,16 +196,20 @@ def get_current_user_info(current_user: FirebaseUser = Depends(get_current_activ
     return current_user
 
 @router.get("/users", response_model=list[UserResponse])
-def get_all_users(current_user: FirebaseUser = Depends(get_current_active_user)):
-    """모든 사용자 조회 (관리자만)"""
+def get_all_users(
+    fields: Fields = Depends(field_selector(UserResponse)),
+    current_user: FirebaseUser = Depends(get_current_active_user)
+):
+    """모든 사용자 조회 (관리자만, fields로 필요한 필드만 요청 가능, 페이지 단위로 읽으며 스트리밍)"""
     if current_user.role != 'admin':
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    users = get_all_users()
-    return users
+    # 응답 필드만 조회해 비밀번호 해시는 Firestore에서 읽지 않음
+    users = iter_users(select_fields(fields or tuple(UserResponse.model_fields)))
+    return stream_project(users, UserResponse, fields)
 
 @router.put("/users/{user_id}/role")
 def update_user_role(
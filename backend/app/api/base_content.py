@@ -1,37 +1,60 @@
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from datetime import datetime
 
-from ..firebase_db import get_collection, get_document
+from ..firebase_db import get_async_collection
+from ..projection import Fields, field_selector, project, select_fields, wants
+from ..recommender import related_index, content_key, content_document
+from ..replicas import replicas
 from ..schemas import BaseContentCreate, BaseContentResponse
 
 router = APIRouter()
 
+def _index_related(content_dict: dict):
+    document = content_document('base_content', content_dict['id'], content_dict)
+    related_index.upsert(document['key'], document['meta'], document['text'])
+
 @router.get("/", response_model=List[BaseContentResponse])
-def get_all_base_content():
-    """모든 기본 컨텐츠 조회"""
+async def get_all_base_content(fields: Fields = Depends(field_selector(BaseContentResponse))):
+    """모든 기본 컨텐츠 조회 (fields로 필요한 필드만 요청 가능)"""
     try:
-        content_collection = get_collection('base_content')
+        with_related = wants(fields, 'related')
+        content_replica = replicas['base_content']
+        if content_replica.ready:
+            contents = content_replica.all(order_by='created_at', descending=True)
+            if with_related:
+                for content_data in contents:
+                    content_data['related'] = related_index.related(content_key('base_content', content_data['id']))
+            return project(contents, BaseContentResponse, fields)
+        
+        content_collection = get_async_collection('base_content')
         if not content_collection:
             return []
         
-        docs = content_collection.order_by('created_at', direction='desc').stream()
+        query = content_collection.order_by('created_at', direction='desc')
+        if fields is not None:
+            query = query.select(select_fields(fields))
         contents = []
-        for doc in docs:
+        async for doc in query.stream():
             content_data = doc.to_dict()
             content_data['id'] = doc.id
+            if with_related:
+                content_data['related'] = related_index.related(content_key('base_content', doc.id))
             contents.append(content_data)
         
-        return contents
+        return project(contents, BaseContentResponse, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_all_base_content: {e}")
         return []
 
 @router.post("/", response_model=BaseContentResponse)
-def add_base_content(content_data: BaseContentCreate):
+async def add_base_content(content_data: BaseContentCreate):
     """새 기본 컨텐츠 추가"""
     try:
-        content_collection = get_collection('base_content')
+        content_collection = get_async_collection('base_content')
         if not content_collection:
             raise HTTPException(status_code=500, detail="Database connection failed")
         
@@ -42,8 +65,10 @@ def add_base_content(content_data: BaseContentCreate):
             'created_at': datetime.now().isoformat()
         }
         
-        doc_ref = content_collection.add(content_dict)
+        doc_ref = await content_collection.add(content_dict)
         content_dict['id'] = doc_ref[1].id
+        replicas['base_content'].upsert(content_dict['id'], content_dict)
+        await run_in_threadpool(_index_related, content_dict)
         
         return content_dict
     except HTTPException:
@@ -53,6 +78,6 @@ def add_base_content(content_data: BaseContentCreate):
         raise HTTPException(status_code=500, detail="Failed to add base content")
 
 @router.options("/")
-def options_base_content():
+async def options_base_content():
     """OPTIONS 요청 처리"""
     return {"message": "OK"} 
\ No newline at end of file
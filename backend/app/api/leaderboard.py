@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from ..leaderboard import PERIODS, leaderboard
+
+router = APIRouter()
+
+def _check_period(period: str):
+    if period not in PERIODS:
+        raise HTTPException(status_code=404, detail=f"period must be one of {', '.join(PERIODS)}")
+
+@router.get("/{period}")
+def get_leaderboard(period: str, date: Optional[str] = None, limit: int = Query(10, ge=1, le=100)):
+    """기간별 상위 N명 조회 (date가 없으면 오늘 기준)"""
+    _check_period(period)
+    try:
+        return {"period": period, "entries": leaderboard.top(period, date, limit)}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date must be in YYYY-MM-DD format")
+    except Exception as e:
+        print(f"Error in get_leaderboard: {e}")
+        return {"period": period, "entries": []}
+
+@router.get("/{period}/rank/{session_id}")
+def get_leaderboard_rank(period: str, session_id: str, date: Optional[str] = None):
+    """기간별 내 순위 조회"""
+    _check_period(period)
+    try:
+        position = leaderboard.position(period, date, session_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date must be in YYYY-MM-DD format")
+    except Exception as e:
+        print(f"Error in get_leaderboard_rank: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get leaderboard rank")
+    if position is None:
+        raise HTTPException(status_code=404, detail="No score recorded for this session")
+    return {"period": period, **position}
+
+@router.options("/")
+def options_leaderboard():
+    """OPTIONS 요청 처리"""
+    return {"message": "OK"}
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from typing import List, Optional
 from datetime import datetime, timedelta
 import json
 
-from ..firebase_db import get_collection, get_document
+from ..firebase_db import get_collection, get_document, get_firestore_client, scan_collection, SCAN_PAGE_SIZE
 from ..firebase_models import FirebaseActivityLog
 from ..firebase_auth import get_current_active_user
+from ..single_flight import single_flight
+from ..threadpool import route_limit
 
 router = APIRouter()
 
@@ -47,7 +49,7 @@ def create_log(
         print(f"Error in create_log: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to create log: {str(e)}")
 
-@router.get("/")
+@router.get("/", dependencies=[Depends(route_limit('admin'))])
 def get_logs(
     skip: int = 0,
     limit: int = 100,
@@ -103,12 +105,12 @@ def get_logs(
         
     except Exception as e:
         print(f"❌ 로그 조회 에러: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Internal error during log access: {str(e)}"
-            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal error during log access: {str(e)}"
+        )
 
-@router.get("/simple")
+@router.get("/simple", dependencies=[Depends(route_limit('admin'))])
 def get_logs_simple(
     skip: int = 0,
     limit: int = 50
@@ -143,15 +145,14 @@ def get_logs_simple(
         print(f"Error in get_logs_simple: {e}")
         return {"logs": [], "total": 0, "skip": skip, "limit": limit}
 
-@router.get("/stats")
-def get_log_stats():
-    """로그 통계 조회"""
+def _compute_log_stats() -> dict:
     try:
         log_collection = get_collection('activity_logs')
         if not log_collection:
             return {"total_logs": 0, "log_types": {}, "log_levels": {}}
         
-        docs = log_collection.stream()
+        # 통계에 필요한 필드만 페이지 단위로 읽음
+        docs = scan_collection(log_collection, fields=['log_type', 'log_level'])
         
         total_logs = 0
         log_types = {}
@@ -168,9 +169,9 @@ def get_log_stats():
             # 로그 레벨 통계
             log_level = log_data.get('log_level', 'unknown')
             log_levels[log_level] = log_levels.get(log_level, 0) + 1
-    
-    return {
-        "total_logs": total_logs,
+        
+        return {
+            "total_logs": total_logs,
             "log_types": log_types,
             "log_levels": log_levels
         }
@@ -179,7 +180,12 @@ def get_log_stats():
         print(f"Error in get_log_stats: {e}")
         return {"total_logs": 0, "log_types": {}, "log_levels": {}}
 
-@router.delete("/")
+@router.get("/stats", dependencies=[Depends(route_limit('admin'))])
+async def get_log_stats():
+    """로그 통계 조회 (동시 요청은 스캔 1회를 공유)"""
+    return await single_flight.do(('logs', 'stats'), _compute_log_stats)
+
+@router.delete("/", dependencies=[Depends(route_limit('admin'))])
 def clear_logs():
     """모든 로그 삭제 (관리자만)"""
     try:
@@ -187,13 +193,23 @@ def clear_logs():
         if not log_collection:
             raise HTTPException(status_code=500, detail="Database connection failed")
         
-        # 모든 문서 삭제
-        docs = log_collection.stream()
+        # 모든 문서 삭제 (키만 페이지 단위로 읽어 배치로 삭제)
+        db = get_firestore_client()
+        batch = db.batch()
+        pending = 0
         deleted_count = 0
         
-        for doc in docs:
-            doc.reference.delete()
-            deleted_count += 1
+        for doc in scan_collection(log_collection, fields=[]):
+            batch.delete(doc.reference)
+            pending += 1
+            if pending == SCAN_PAGE_SIZE:
+                batch.commit()
+                deleted_count += pending
+                batch = db.batch()
+                pending = 0
+        if pending:
+            batch.commit()
+            deleted_count += pending
         
         return {"message": f"All logs deleted successfully", "deleted_count": deleted_count}
         
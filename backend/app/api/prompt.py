@@ -1,37 +1,82 @@
-from fastapi import APIRouter, HTTPException, Response
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
 from datetime import datetime
+from google.api_core.exceptions import FailedPrecondition, NotFound
 
-from ..firebase_db import get_collection, get_document
+from ..bulk_import import BulkImporter, import_response, read_bulk_rows
+from ..firebase_db import (
+    get_async_collection, get_async_document, get_async_firestore_client,
+    document_version, precondition_option
+)
+from ..projection import Fields, field_selector, project, select_fields, wants
+from ..recommender import related_index, content_key, content_document
+from ..replicas import replicas
 from ..schemas import PromptCreate, PromptResponse
 
 router = APIRouter()
 
+def _index_related(prompt_dict: dict):
+    document = content_document('prompt', prompt_dict['id'], prompt_dict)
+    related_index.upsert(document['key'], document['meta'], document['text'])
+
+def _prepare_prompt(prompt_dict: dict, created: bool) -> dict:
+    if created:
+        prompt_dict['created_at'] = datetime.now().isoformat()
+    return prompt_dict
+
+_prompt_importer = BulkImporter('prompt', PromptCreate, ['title'], prepare=_prepare_prompt)
+
+def _import_prompts(rows: List[dict]):
+    written = 0
+    for result in _prompt_importer.run(rows):
+        if 'summary' in result:
+            written = result['summary']['created'] + result['summary']['updated']
+        yield result
+    # 관련 컨텐츠 인덱스는 행마다 갱신하지 않고 전체 가져오기가 끝난 뒤 한 번만 재구성
+    if written:
+        related_index.load()
+
+def _with_related(prompt_data: dict, fields: Fields = None) -> dict:
+    if wants(fields, 'related'):
+        prompt_data['related'] = related_index.related(content_key('prompt', prompt_data['id']))
+    return prompt_data
+
 @router.get("/", response_model=List[PromptResponse])
-def get_all_prompts():
-    """모든 프롬프트 조회"""
+async def get_all_prompts(fields: Fields = Depends(field_selector(PromptResponse))):
+    """모든 프롬프트 조회 (fields로 필요한 필드만 요청 가능)"""
     try:
-        prompt_collection = get_collection('prompt')
+        prompt_replica = replicas['prompt']
+        if prompt_replica.ready:
+            prompts = prompt_replica.all(order_by='created_at', descending=True)
+            return project([_with_related(prompt, fields) for prompt in prompts], PromptResponse, fields)
+        
+        prompt_collection = get_async_collection('prompt')
         if not prompt_collection:
             return []
         
-        docs = prompt_collection.order_by('created_at', direction='desc').stream()
+        query = prompt_collection.order_by('created_at', direction='desc')
+        if fields is not None:
+            query = query.select(select_fields(fields))
         prompts = []
-        for doc in docs:
+        async for doc in query.stream():
             prompt_data = doc.to_dict()
             prompt_data['id'] = doc.id
-            prompts.append(prompt_data)
+            prompt_data['version'] = document_version(doc.update_time)
+            prompts.append(_with_related(prompt_data, fields))
         
-        return prompts
+        return project(prompts, PromptResponse, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_all_prompts: {e}")
         return []
 
 @router.post("/", response_model=PromptResponse)
-def add_prompt(prompt_data: PromptCreate):
+async def add_prompt(prompt_data: PromptCreate):
     """새 프롬프트 추가"""
     try:
-        prompt_collection = get_collection('prompt')
+        prompt_collection = get_async_collection('prompt')
         if not prompt_collection:
             raise HTTPException(status_code=500, detail="Database connection failed")
         
@@ -42,8 +87,10 @@ def add_prompt(prompt_data: PromptCreate):
             'created_at': datetime.now().isoformat()
         }
         
-        doc_ref = prompt_collection.add(prompt_dict)
+        doc_ref = await prompt_collection.add(prompt_dict)
         prompt_dict['id'] = doc_ref[1].id
+        replicas['prompt'].upsert(prompt_dict['id'], prompt_dict)
+        await run_in_threadpool(_index_related, prompt_dict)
         
         return prompt_dict
     except HTTPException:
@@ -53,16 +100,22 @@ def add_prompt(prompt_data: PromptCreate):
         raise HTTPException(status_code=500, detail="Failed to add prompt")
 
 @router.put("/{prompt_id}", response_model=PromptResponse)
-def update_prompt(prompt_id: str, prompt_data: PromptCreate):
-    """프롬프트 수정"""
+async def update_prompt(
+    prompt_id: str,
+    prompt_data: PromptCreate,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """프롬프트 수정 (사전 조건으로 존재/버전을 확인하는 단일 쓰기, If-Match로 버전 지정)"""
     try:
-        prompt_ref = get_document('prompt', prompt_id)
-        if not prompt_ref:
-            raise HTTPException(status_code=404, detail="Prompt not found")
-        
-        doc = prompt_ref.get()
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Prompt not found")
+        db = get_async_firestore_client()
+        if not db:
+            raise HTTPException(status_code=500, detail="Database connection failed")
+        prompt_ref = db.collection('prompt').document(prompt_id)
+        try:
+            option = precondition_option(db, if_match)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid If-Match version")
         
         prompt_dict = {
             'title': prompt_data.title,
@@ -70,25 +123,38 @@ def update_prompt(prompt_id: str, prompt_data: PromptCreate):
             'category': prompt_data.category
         }
         
-        prompt_ref.update(prompt_dict)
-        prompt_dict['id'] = prompt_id
+        write_result = await prompt_ref.update(prompt_dict, option=option)
+        version = document_version(write_result.update_time)
         
-        return prompt_dict
+        prompt_replica = replicas['prompt']
+        updated = {**(prompt_replica.get(prompt_id) or {}), **prompt_dict, 'version': version}
+        prompt_replica.upsert(prompt_id, updated)
+        updated['id'] = prompt_id
+        await run_in_threadpool(_index_related, updated)
+        response.headers["ETag"] = f'"{version}"'
+        
+        return _with_related(updated)
     except HTTPException:
         raise
+    except NotFound:
+        raise HTTPException(status_code=404, detail="Prompt not found")
+    except FailedPrecondition:
+        raise HTTPException(status_code=409, detail="Prompt was modified by another request")
     except Exception as e:
         print(f"Error in update_prompt: {e}")
         raise HTTPException(status_code=500, detail="Failed to update prompt")
 
 @router.delete("/{prompt_id}")
-def delete_prompt(prompt_id: str):
+async def delete_prompt(prompt_id: str):
     """프롬프트 삭제"""
     try:
-        prompt_ref = get_document('prompt', prompt_id)
+        prompt_ref = get_async_document('prompt', prompt_id)
         if not prompt_ref:
             raise HTTPException(status_code=404, detail="Prompt not found")
         
-        prompt_ref.delete()
+        await prompt_ref.delete()
+        replicas['prompt'].remove(prompt_id)
+        await run_in_threadpool(related_index.remove, content_key('prompt', prompt_id))
         return {"message": "Prompt deleted successfully"}
     except HTTPException:
         raise
@@ -97,28 +163,43 @@ def delete_prompt(prompt_id: str):
         raise HTTPException(status_code=500, detail="Failed to delete prompt")
 
 @router.get("/category/{category}", response_model=List[PromptResponse])
-def get_prompts_by_category(category: str):
-    """카테고리별 프롬프트 조회"""
+async def get_prompts_by_category(category: str, fields: Fields = Depends(field_selector(PromptResponse))):
+    """카테고리별 프롬프트 조회 (fields로 필요한 필드만 요청 가능)"""
     try:
-        prompt_collection = get_collection('prompt')
+        prompt_replica = replicas['prompt']
+        if prompt_replica.ready:
+            prompts = prompt_replica.where('category', category)
+            return project([_with_related(prompt, fields) for prompt in prompts], PromptResponse, fields)
+        
+        prompt_collection = get_async_collection('prompt')
         if not prompt_collection:
             return []
         
         query = prompt_collection.where('category', '==', category)
-        docs = query.stream()
+        if fields is not None:
+            query = query.select(select_fields(fields))
         
         prompts = []
-        for doc in docs:
+        async for doc in query.stream():
             prompt_data = doc.to_dict()
             prompt_data['id'] = doc.id
-            prompts.append(prompt_data)
+            prompt_data['version'] = document_version(doc.update_time)
+            prompts.append(_with_related(prompt_data, fields))
         
-        return prompts
+        return project(prompts, PromptResponse, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_prompts_by_category: {e}")
         return []
 
+@router.post("/bulk")
+async def bulk_upsert_prompts(request: Request, format: Optional[str] = Query(None, pattern="^(json|jsonl|csv)$")):
+    """프롬프트 대량 생성/수정 (JSON 배열, JSONL, CSV), 행별 결과를 JSON Lines로 스트리밍"""
+    rows = await read_bulk_rows(request, format)
+    return import_response(_import_prompts(rows))
+
 @router.options("/")
-def options_prompt():
+async def options_prompt():
     """OPTIONS 요청 처리"""
     return {"message": "OK"} 
\ No newline at end of file
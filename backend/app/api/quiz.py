@@ -1,16 +1,47 @@
-from fastapi import APIRouter, HTTPException, Response
-from typing import List
+from fastapi import APIRouter, HTTPException, Response, Query, Depends, Header, Request
+from typing import Dict, List, Optional, Union
+from datetime import datetime, timedelta, timezone
+import hashlib
 import json
+import random
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition, NotFound
 
-from ..firebase_db import get_collection, get_document
-from ..schemas import QuizCreate, QuizResponse
+from ..bulk_import import BulkImporter, import_response, read_bulk_rows
+from ..cache import TieredCache
+from ..firebase_db import (
+    get_collection, get_document, get_documents, get_firestore_client, document_version, precondition_option
+)
+from ..leaderboard import leaderboard
+from ..projection import Fields, field_selector, project, select_fields
+from ..quiz_generator import get_quiz_pool
+from ..quiz_stats import build_stats_update, item_statistics
+from ..replicas import replicas
+from ..schemas import (
+    QuizCreate, QuizResponse, QuizPublicResponse, QuizSubmission, QuizSubmissionResponse
+)
+from ..threadpool import route_limit
 
 router = APIRouter()
 
+ANSWER_FIELDS = ('correct', 'explanation')
+MAX_SUBMISSION_ANSWERS = 200
+
+# 채점용 정답 키 캐시 (키: 퀴즈 ID)
+_answer_keys = TieredCache('quiz_answer_keys', maxsize=5000, ttl=600)
+
+# 세션·주제별로 이미 출제한 문제 ID (quiz_sessions 문서, 어느 워커로 가도 세션 내 중복 출제 방지)
+# 마지막 출제 후 이 시간이 지나면 기록을 새로 시작 (expires_at 필드에 Firestore TTL 정책 적용 가능)
+SESSION_SEEN_TTL = timedelta(hours=1)
+
 @router.get("/topics", response_model=List[str])
 def get_all_quiz_topics():
     """모든 퀴즈 주제 조회"""
     try:
+        quiz_replica = replicas['quiz']
+        if quiz_replica.ready:
+            return quiz_replica.values('topic')
+        
         quiz_collection = get_collection('quiz')
         if not quiz_collection:
             return []
@@ -22,24 +53,94 @@ def get_all_quiz_topics():
         print(f"Error in get_all_quiz_topics: {e}")
         return []
 
-@router.get("/{topic}", response_model=List[QuizResponse])
-def get_quiz_by_topic(topic: str):
-    """특정 주제의 퀴즈 조회"""
+def _prepare_quiz(quiz_dict: dict, created: bool) -> dict:
+    if created:
+        quiz_dict['random_key'] = random.random()
+    return quiz_dict
+
+def _invalidate_answer_keys(written: list):
+    if any(not created for _, _, created in written):
+        _answer_keys.clear()
+
+# 같은 주제 안에서 질문 문장이 같으면 같은 문제로 간주
+_quiz_importer = BulkImporter(
+    'quiz', QuizCreate, ['topic', 'question'], prepare=_prepare_quiz, after_chunk=_invalidate_answer_keys
+)
+
+def _strip_answers(quizzes: List[dict], include_answers: bool) -> List[dict]:
+    """정답 없이 문제만 전달하는 모드 처리"""
+    if include_answers:
+        return quizzes
+    return [{k: v for k, v in quiz.items() if k not in ANSWER_FIELDS} for quiz in quizzes]
+
+def _get_answer_keys(quiz_ids: List[str]) -> Dict[str, dict]:
+    """정답 키 조회 (캐시에 없는 문제는 get_all 한 번으로 조회)"""
+    keys = {}
+    missing = []
+    for quiz_id in set(quiz_ids):
+        key = _answer_keys.get(quiz_id)
+        if key is None:
+            missing.append(quiz_id)
+        else:
+            keys[quiz_id] = key
+    
+    if missing:
+        db = get_firestore_client()
+        if not db:
+            raise HTTPException(status_code=500, detail="Database connection failed")
+        refs = [db.collection('quiz').document(quiz_id) for quiz_id in missing]
+        for doc in get_documents(refs, fields=['correct', 'explanation', 'topic']).values():
+            if not doc.exists:
+                continue
+            quiz_data = doc.to_dict()
+            key = {
+                'correct': quiz_data.get('correct'),
+                'explanation': quiz_data.get('explanation'),
+                'topic': quiz_data.get('topic')
+            }
+            _answer_keys.set(doc.id, key)
+            keys[doc.id] = key
+    return keys
+
+@router.get("/{topic}", response_model=Union[List[QuizResponse], List[QuizPublicResponse]])
+def get_quiz_by_topic(
+    topic: str,
+    include_answers: bool = True,
+    fields: Fields = Depends(field_selector(QuizResponse))
+):
+    """특정 주제의 퀴즈 조회 (include_answers=false이면 정답/해설 제외, fields로 필요한 필드만 요청 가능)"""
+    model = QuizResponse if include_answers else QuizPublicResponse
+    if fields is not None and not include_answers:
+        fields = tuple(name for name in fields if name not in ANSWER_FIELDS)
+        if not fields:
+            raise HTTPException(status_code=400, detail="Answer fields require include_answers=true")
     try:
+        quiz_replica = replicas['quiz']
+        if quiz_replica.ready:
+            return project(_strip_answers(quiz_replica.where('topic', topic), include_answers), model, fields)
+        
         quiz_collection = get_collection('quiz')
         if not quiz_collection:
             return []
         
         query = quiz_collection.where('topic', '==', topic)
+        if fields is not None:
+            query = query.select(select_fields(fields))
+        elif not include_answers:
+            # 정답/해설은 읽지 않음
+            query = query.select(select_fields(tuple(QuizPublicResponse.model_fields)))
         docs = query.stream()
         
         quizzes = []
         for doc in docs:
             quiz_data = doc.to_dict()
             quiz_data['id'] = doc.id
+            quiz_data['version'] = document_version(doc.update_time)
             quizzes.append(quiz_data)
         
-        return quizzes
+        return project(_strip_answers(quizzes, include_answers), model, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_quiz_by_topic: {e}")
         return []
@@ -60,11 +161,13 @@ def add_quiz(quiz_data: QuizCreate):
             'option3': quiz_data.option3,
             'option4': quiz_data.option4,
             'correct': quiz_data.correct,
-            'explanation': quiz_data.explanation
+            'explanation': quiz_data.explanation,
+            'random_key': random.random()
         }
         
         doc_ref = quiz_collection.add(quiz_dict)
         quiz_dict['id'] = doc_ref[1].id
+        replicas['quiz'].upsert(quiz_dict['id'], quiz_dict)
         
         return quiz_dict
     except HTTPException:
@@ -73,17 +176,137 @@ def add_quiz(quiz_data: QuizCreate):
         print(f"Error in add_quiz: {e}")
         raise HTTPException(status_code=500, detail="Failed to add quiz")
 
-@router.put("/{quiz_id}", response_model=QuizResponse)
-def update_quiz(quiz_id: str, quiz_data: QuizCreate):
-    """퀴즈 수정"""
+@router.post("/submit", response_model=QuizSubmissionResponse)
+def submit_quiz(submission: QuizSubmission):
+    """퀴즈 응시 결과를 서버에서 채점하고 응시 기록과 진행 통계를 한 번에 저장"""
     try:
-        quiz_ref = get_document('quiz', quiz_id)
-        if not quiz_ref:
-            raise HTTPException(status_code=404, detail="Quiz not found")
+        if not submission.answers:
+            raise HTTPException(status_code=400, detail="No answers submitted")
+        if len(submission.answers) > MAX_SUBMISSION_ANSWERS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_SUBMISSION_ANSWERS} answers per submission")
         
-        doc = quiz_ref.get()
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Quiz not found")
+        # 같은 문제를 여러 번 보내 점수/통계/리더보드를 부풀리는 것 방지
+        quiz_ids = [answer.quiz_id for answer in submission.answers]
+        if len(set(quiz_ids)) != len(quiz_ids):
+            raise HTTPException(status_code=400, detail="Each quiz_id may be answered only once per submission")
+        
+        answer_keys = _get_answer_keys(quiz_ids)
+        
+        results = []
+        score = 0
+        for answer in submission.answers:
+            key = answer_keys.get(answer.quiz_id)
+            is_correct = key is not None and key['correct'] == answer.choice
+            score += int(is_correct)
+            results.append({
+                'quiz_id': answer.quiz_id,
+                'choice': answer.choice,
+                'correct': key['correct'] if key else None,
+                'is_correct': is_correct,
+                'explanation': key['explanation'] if key else None
+            })
+        total = len(results)
+        
+        db = get_firestore_client()
+        if not db:
+            raise HTTPException(status_code=500, detail="Database connection failed")
+        
+        attempt_ref = db.collection('quiz_attempts').document()
+        stats_ref = db.collection('user_quiz_stats').document(submission.session_id)
+        now = datetime.now().isoformat()
+        
+        batch = db.batch()
+        batch.set(attempt_ref, {
+            'session_id': submission.session_id,
+            'date': submission.date,
+            'topic': submission.topic,
+            'answers': [{'quiz_id': r['quiz_id'], 'choice': r['choice'], 'is_correct': r['is_correct']} for r in results],
+            'score': score,
+            'total': total,
+            'created_at': now
+        })
+        batch.set(stats_ref, {
+            'session_id': submission.session_id,
+            'quiz_attempts': firestore.Increment(1),
+            'quiz_answered': firestore.Increment(total),
+            'quiz_correct': firestore.Increment(score),
+            'last_quiz_date': submission.date,
+            'updated_at': now
+        }, merge=True)
+        
+        # 문항별 통계 누적 (이 문항을 제외한 나머지 정답률을 변별도 계산에 사용)
+        for result in results:
+            key = answer_keys.get(result['quiz_id'])
+            if key is None:
+                continue
+            rest_score = (score - int(result['is_correct'])) / (total - 1) if total > 1 else None
+            stats_update = build_stats_update(result['choice'], result['is_correct'], rest_score)
+            stats_update['topic'] = key.get('topic')
+            batch.set(db.collection('quiz_stats').document(result['quiz_id']), stats_update, merge=True)
+        leaderboard.stage_score(batch, submission.session_id, score, submission.date)
+        batch.commit()
+        leaderboard.apply_score(submission.session_id, score, submission.date)
+        
+        return {
+            'attempt_id': attempt_ref.id,
+            'score': score,
+            'total': total,
+            'results': results
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in submit_quiz: {e}")
+        raise HTTPException(status_code=500, detail="Failed to submit quiz")
+
+@router.get("/stats/items", dependencies=[Depends(route_limit('admin'))])
+def get_quiz_item_stats(
+    sort_by: str = Query("discrimination", pattern="^(discrimination|correct_rate|attempts)$"),
+    descending: bool = False,
+    min_attempts: int = Query(5, ge=0),
+    topic: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """문항 난이도/변별도 순위 조회 (관리자용, 누적 통계 문서만 읽음)"""
+    try:
+        stats_collection = get_collection('quiz_stats')
+        if not stats_collection:
+            return []
+        
+        query = stats_collection.where('topic', '==', topic) if topic else stats_collection
+        items = []
+        for doc in query.stream():
+            stats = item_statistics(doc.id, doc.to_dict())
+            if stats['attempts'] < min_attempts:
+                continue
+            items.append(stats)
+        
+        # 값이 없는 문항(모두 정답/오답 등)은 항상 뒤로
+        ranked = [item for item in items if item[sort_by] is not None]
+        ranked.sort(key=lambda item: item[sort_by], reverse=descending)
+        ranked.extend(item for item in items if item[sort_by] is None)
+        return ranked[:limit]
+    except Exception as e:
+        print(f"Error in get_quiz_item_stats: {e}")
+        return []
+
+@router.put("/{quiz_id}", response_model=QuizResponse)
+def update_quiz(
+    quiz_id: str,
+    quiz_data: QuizCreate,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """퀴즈 수정 (사전 조건으로 존재/버전을 확인하는 단일 쓰기, If-Match로 버전 지정)"""
+    try:
+        db = get_firestore_client()
+        if not db:
+            raise HTTPException(status_code=500, detail="Database connection failed")
+        quiz_ref = db.collection('quiz').document(quiz_id)
+        try:
+            option = precondition_option(db, if_match)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid If-Match version")
         
         quiz_dict = {
             'topic': quiz_data.topic,
@@ -96,12 +319,22 @@ def update_quiz(quiz_id: str, quiz_data: QuizCreate):
             'explanation': quiz_data.explanation
         }
         
-        quiz_ref.update(quiz_dict)
-        quiz_dict['id'] = quiz_id
+        write_result = quiz_ref.update(quiz_dict, option=option)
+        version = document_version(write_result.update_time)
+        _answer_keys.delete(quiz_id)
         
-        return quiz_dict
+        quiz_replica = replicas['quiz']
+        updated = {**(quiz_replica.get(quiz_id) or {}), **quiz_dict, 'version': version}
+        quiz_replica.upsert(quiz_id, updated)
+        response.headers["ETag"] = f'"{version}"'
+        
+        return {**updated, 'id': quiz_id}
     except HTTPException:
         raise
+    except NotFound:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    except FailedPrecondition:
+        raise HTTPException(status_code=409, detail="Quiz was modified by another request")
     except Exception as e:
         print(f"Error in update_quiz: {e}")
         raise HTTPException(status_code=500, detail="Failed to update quiz")
@@ -115,6 +348,8 @@ def delete_quiz(quiz_id: str):
             raise HTTPException(status_code=404, detail="Quiz not found")
         
         quiz_ref.delete()
+        _answer_keys.delete(quiz_id)
+        replicas['quiz'].remove(quiz_id)
         return {"message": "Quiz deleted successfully"}
     except HTTPException:
         raise
@@ -124,7 +359,14 @@ def delete_quiz(quiz_id: str):
 
 @router.get("/generate/{topic}")
 def generate_quiz(topic: str):
-    """주제에 따른 퀴즈를 생성합니다."""
+    """주제에 따른 퀴즈를 생성합니다. (날짜별로 미리 생성된 문제 풀이 있으면 그 중에서 출제)"""
+    try:
+        pool = get_quiz_pool(topic)
+        if pool:
+            return random.choice(pool)
+    except Exception as e:
+        print(f"Error in generate_quiz pool lookup: {e}")
+    
     # 간단한 퀴즈 생성 로직 (실제로는 더 복잡한 로직이 필요)
     quiz_templates = {
         "AI": {
@@ -173,6 +415,89 @@ def generate_quiz(topic: str):
             "explanation": "기본 퀴즈입니다."
         }
 
+def _session_seen_ref(db, session_id: str, topic: str):
+    # 주제에는 문서 ID로 쓸 수 없는 문자가 있을 수 있으므로 해시 사용
+    topic_key = hashlib.sha1(topic.encode('utf-8')).hexdigest()[:16]
+    return db.collection('quiz_sessions').document(f"{session_id}__{topic_key}")
+
+def _load_session_seen(seen_ref) -> set:
+    doc = seen_ref.get()
+    if not doc.exists:
+        return set()
+    data = doc.to_dict()
+    expires_at = data.get('expires_at')
+    if expires_at is None or expires_at < datetime.now(timezone.utc):
+        return set()
+    return set(data.get('quiz_ids') or [])
+
+def _save_session_seen(seen_ref, session_id: str, topic: str, quiz_ids: List[str], reset: bool):
+    """출제한 문제 ID 추가 (ArrayUnion이므로 같은 세션의 동시 요청도 서로 덮어쓰지 않음)"""
+    seen_ref.set({
+        'session_id': session_id,
+        'topic': topic,
+        'quiz_ids': quiz_ids if reset else firestore.ArrayUnion(quiz_ids),
+        'expires_at': datetime.now(timezone.utc) + SESSION_SEEN_TTL
+    }, merge=not reset)
+
+def _sample_topic(quiz_collection, topic: str, n: int, exclude: set) -> list:
+    """랜덤 키 인덱스로 주제에서 n개 표본 추출 (random_key >= r 이후 처음부터 이어서 조회)"""
+    r = random.random()
+    base_query = quiz_collection.where('topic', '==', topic).order_by('random_key')
+    page_size = n * 2
+    sampled = []
+    for segment in (base_query.where('random_key', '>=', r), base_query.where('random_key', '<', r)):
+        cursor = None
+        while len(sampled) < n:
+            query = segment.limit(page_size)
+            if cursor:
+                query = query.start_after(cursor)
+            docs = list(query.stream())
+            for doc in docs:
+                if doc.id in exclude:
+                    continue
+                quiz_data = doc.to_dict()
+                quiz_data['id'] = doc.id
+                sampled.append(quiz_data)
+                if len(sampled) >= n:
+                    break
+            if len(docs) < page_size:
+                break
+            cursor = docs[-1]
+        if len(sampled) >= n:
+            break
+    random.shuffle(sampled)
+    return sampled
+
+@router.get("/{topic}/sample", response_model=Union[List[QuizResponse], List[QuizPublicResponse]])
+def sample_quiz(
+    topic: str,
+    n: int = Query(5, ge=1, le=50),
+    session_id: Optional[str] = None,
+    include_answers: bool = True
+):
+    """주제에서 무작위 퀴즈 n개 추출 (session_id가 있으면 세션 내 중복 없이)"""
+    try:
+        quiz_collection = get_collection('quiz')
+        if not quiz_collection:
+            return []
+        
+        seen_ref = _session_seen_ref(get_firestore_client(), session_id, topic) if session_id else None
+        seen = _load_session_seen(seen_ref) if seen_ref else set()
+        quizzes = _sample_topic(quiz_collection, topic, n, seen)
+        if seen_ref and quizzes:
+            _save_session_seen(seen_ref, session_id, topic, [quiz['id'] for quiz in quizzes], reset=not seen)
+        
+        return _strip_answers(quizzes, include_answers)
+    except Exception as e:
+        print(f"Error in sample_quiz: {e}")
+        return []
+
+@router.post("/bulk")
+async def bulk_upsert_quizzes(request: Request, format: Optional[str] = Query(None, pattern="^(json|jsonl|csv)$")):
+    """퀴즈 대량 생성/수정 (JSON 배열, JSONL, CSV), 행별 결과를 JSON Lines로 스트리밍"""
+    rows = await read_bulk_rows(request, format)
+    return import_response(_quiz_importer.run(rows))
+
 @router.options("/")
 def options_quiz():
     """OPTIONS 요청 처리"""
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from datetime import datetime, timezone
+
+from ..firebase_db import get_async_collection
+from ..review_scheduler import REVIEW_KINDS, review_doc_id, sm2
+from ..schemas import ReviewAnswer, ReviewStateResponse
+
+router = APIRouter()
+
+@router.get("/due", response_model=List[ReviewStateResponse])
+async def get_due_reviews(
+    session_id: str,
+    kind: Optional[str] = Query(None, pattern="^(term|quiz)$"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """복습할 시점이 된 항목 조회 (session_id, [kind,] due_at 인덱스 범위 조회)"""
+    try:
+        review_collection = get_async_collection('review_state')
+        if not review_collection:
+            return []
+
+        query = review_collection.where('session_id', '==', session_id)
+        if kind:
+            query = query.where('kind', '==', kind)
+        query = (
+            query.where('due_at', '<=', datetime.now(timezone.utc))
+            .order_by('due_at')
+            .limit(limit)
+        )
+
+        reviews = []
+        async for doc in query.stream():
+            review_data = doc.to_dict()
+            review_data['id'] = doc.id
+            reviews.append(review_data)
+
+        return reviews
+    except Exception as e:
+        print(f"Error in get_due_reviews: {e}")
+        return []
+
+@router.post("/answer", response_model=ReviewStateResponse)
+async def answer_review(answer: ReviewAnswer):
+    """복습 결과를 반영해 다음 복습 일정 저장 (문서 1건 쓰기)"""
+    if answer.kind not in REVIEW_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(REVIEW_KINDS)}")
+    if not 0 <= answer.quality <= 5:
+        raise HTTPException(status_code=400, detail="quality must be between 0 and 5")
+
+    try:
+        review_collection = get_async_collection('review_state')
+        if not review_collection:
+            raise HTTPException(status_code=500, detail="Database connection failed")
+
+        doc_id = review_doc_id(answer.session_id, answer.kind, answer.item_id)
+        review_ref = review_collection.document(doc_id)
+        doc = await review_ref.get()
+
+        review_data = sm2(doc.to_dict() if doc.exists else None, answer.quality)
+        review_data.update({
+            'session_id': answer.session_id,
+            'kind': answer.kind,
+            'item_id': answer.item_id
+        })
+        await review_ref.set(review_data)
+
+        review_data['id'] = doc_id
+        return review_data
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in answer_review: {e}")
+        raise HTTPException(status_code=500, detail="Failed to save review")
+
+@router.options("/")
+async def options_review():
+    """OPTIONS 요청 처리"""
+    return {"message": "OK"}
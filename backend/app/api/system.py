@@ -1,11 +1,23 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends
 from typing import Dict, Any
 from datetime import datetime
 
-from ..firebase_db import get_collection, test_connection
+from ..cache import tiered_caches
+from ..firebase_db import get_async_collection, async_test_connection, async_scan_collection
+from ..replicas import replicas
+from ..single_flight import single_flight
+from ..threadpool import route_limit, threadpool_monitor
+from .user_progress import progress_writes
 
 router = APIRouter()
 
+async def _count_documents(collection) -> int:
+    # 페이지 단위로 문서 키만 읽어 긴 스트림의 기한 초과를 피함
+    count = 0
+    async for _ in async_scan_collection(collection, fields=[]):
+        count += 1
+    return count
+
 @router.get("/system-info")
 def get_system_info():
     """시스템 정보 조회"""
@@ -32,7 +44,7 @@ def get_system_info():
 async def get_database_status():
     """데이터베이스 상태 확인"""
     try:
-        is_connected = test_connection()
+        is_connected = await async_test_connection()
         return {
             "database": "Firebase Firestore",
             "status": "connected" if is_connected else "disconnected",
@@ -49,9 +61,7 @@ async def get_database_status():
             "connection_test": False
         }
 
-@router.get("/admin-stats")
-async def get_admin_stats():
-    """관리자 통계 조회"""
+async def _compute_admin_stats() -> dict:
     try:
         stats = {
             "total_users": 0,
@@ -61,29 +71,16 @@ async def get_admin_stats():
             "timestamp": datetime.now().isoformat()
         }
         
-        # 사용자 수
-        users_collection = get_collection('users')
-        if users_collection:
-            users_docs = users_collection.stream()
-            stats["total_users"] = len(list(users_docs))
-        
-        # AI 정보 수
-        ai_info_collection = get_collection('ai_info')
-        if ai_info_collection:
-            ai_info_docs = ai_info_collection.stream()
-            stats["total_ai_info"] = len(list(ai_info_docs))
-        
-        # 퀴즈 수
-        quiz_collection = get_collection('quiz')
-        if quiz_collection:
-            quiz_docs = quiz_collection.stream()
-            stats["total_quizzes"] = len(list(quiz_docs))
-        
-        # 로그 수
-        logs_collection = get_collection('activity_logs')
-        if logs_collection:
-            logs_docs = logs_collection.stream()
-            stats["total_logs"] = len(list(logs_docs))
+        # 컬렉션별 문서 수 (필드 없이 키만 읽음)
+        for stat_key, collection_name in (
+            ("total_users", 'users'),
+            ("total_ai_info", 'ai_info'),
+            ("total_quizzes", 'quiz'),
+            ("total_logs", 'activity_logs')
+        ):
+            collection = get_async_collection(collection_name)
+            if collection:
+                stats[stat_key] = await _count_documents(collection)
         
         return stats
         
@@ -91,6 +88,51 @@ async def get_admin_stats():
         print(f"Error in get_admin_stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get admin stats")
 
+@router.get("/admin-stats", dependencies=[Depends(route_limit('admin'))])
+async def get_admin_stats():
+    """관리자 통계 조회 (동시 요청은 집계 1회를 공유)"""
+    return await single_flight.do(('system', 'admin-stats'), _compute_admin_stats)
+
+@router.get("/threadpool")
+async def get_threadpool_stats():
+    """스레드풀 사용량과 라우트 그룹별 대기 시간/거절 수 조회"""
+    return {
+        **threadpool_monitor.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/single-flight")
+async def get_single_flight_stats():
+    """요청 합치기 통계 (합쳐진 요청 비율 등)"""
+    return {
+        **single_flight.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/replicas")
+async def get_replica_stats():
+    """컬렉션 복제본 상태와 복제 지연 조회"""
+    return {
+        "replicas": replicas.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/write-queue")
+async def get_write_queue_stats():
+    """지연 쓰기(진행상황 저장) 대기/재시도/실패/유실 건수 조회"""
+    return {
+        "user_progress": progress_writes.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/cache")
+async def get_cache_stats():
+    """캐시별 1차(메모리)/2차(공유 디스크) 적중률 조회"""
+    return {
+        "caches": {namespace: cache.stats() for namespace, cache in tiered_caches.items()},
+        "timestamp": datetime.now().isoformat()
+    }
+
 @router.post("/init-database")
 async def init_database_tables():
     """데이터베이스 초기화"""
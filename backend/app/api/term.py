@@ -1,37 +1,91 @@
-from fastapi import APIRouter, HTTPException, Response
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
 from datetime import datetime
 
-from ..firebase_db import get_collection, get_document
-from ..schemas import TermCreate, TermResponse
+from ..bulk_import import BulkImporter, import_response, read_bulk_rows
+from ..firebase_db import get_async_collection
+from ..projection import Fields, field_selector, project, select_fields
+from ..schemas import TermCreate, TermResponse, TermSuggestion
+from ..term_index import term_index
+from ..term_linker import term_linker
+from ..replicas import replicas
 
 router = APIRouter()
 
+def _prepare_term(term_dict: dict, created: bool) -> dict:
+    if created:
+        term_dict['created_at'] = datetime.now().isoformat()
+    return term_dict
+
+def _index_terms(written: list):
+    for term_id, term_dict, _ in written:
+        term_index.add(term_id, term_dict['term'], term_dict['description'])
+
+def _sync_term_indexes(replica, changes):
+    """복제본 스냅샷으로 받은 용어 변경(다른 워커의 쓰기 포함)을 자동완성/링크 인덱스에 반영"""
+    if not changes:
+        return
+    term_index.rebuild(replica.all())
+    term_linker.rebuild(term_index.terms())
+
+replicas['term'].add_listener(_sync_term_indexes)
+
+_term_importer = BulkImporter('term', TermCreate, ['term'], prepare=_prepare_term, after_chunk=_index_terms)
+
+def _import_terms(rows: List[dict]):
+    yield from _term_importer.run(rows)
+    # 용어 링크 오토마톤은 전체 가져오기가 끝난 뒤 한 번만 재구성
+    term_linker.rebuild(term_index.terms())
+
 @router.get("/", response_model=List[TermResponse])
-def get_all_terms():
-    """모든 용어 조회"""
+async def get_all_terms(fields: Fields = Depends(field_selector(TermResponse))):
+    """모든 용어 조회 (fields=term,description 처럼 필요한 필드만 요청 가능)"""
     try:
-        term_collection = get_collection('term')
+        term_replica = replicas['term']
+        if term_replica.ready:
+            return project(term_replica.all(order_by='created_at', descending=True), TermResponse, fields)
+        
+        term_collection = get_async_collection('term')
         if not term_collection:
             return []
         
-        docs = term_collection.order_by('created_at', direction='desc').stream()
+        query = term_collection.order_by('created_at', direction='desc')
+        if fields is not None:
+            query = query.select(select_fields(fields))
         terms = []
-        for doc in docs:
+        async for doc in query.stream():
             term_data = doc.to_dict()
             term_data['id'] = doc.id
             terms.append(term_data)
         
-        return terms
+        return project(terms, TermResponse, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_all_terms: {e}")
         return []
 
+@router.get("/autocomplete", response_model=List[TermSuggestion])
+async def autocomplete_terms(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    fuzzy: bool = True
+):
+    """용어 자동완성 (접두어, 초성, 오타 허용 검색)"""
+    try:
+        if not term_index.loaded:
+            await run_in_threadpool(term_index.ensure_loaded)
+        return term_index.search(q, limit=limit, fuzzy=fuzzy)
+    except Exception as e:
+        print(f"Error in autocomplete_terms: {e}")
+        return []
+
 @router.post("/", response_model=TermResponse)
-def add_term(term_data: TermCreate):
+async def add_term(term_data: TermCreate):
     """새 용어 추가"""
     try:
-        term_collection = get_collection('term')
+        term_collection = get_async_collection('term')
         if not term_collection:
             raise HTTPException(status_code=500, detail="Database connection failed")
         
@@ -42,8 +96,12 @@ def add_term(term_data: TermCreate):
             'created_at': datetime.now().isoformat()
         }
         
-        doc_ref = term_collection.add(term_dict)
+        doc_ref = await term_collection.add(term_dict)
         term_dict['id'] = doc_ref[1].id
+        replicas['term'].upsert(term_dict['id'], term_dict)
+        term_index.add(term_dict['id'], term_dict['term'], term_dict['description'])
+        # 오토마톤 재구성은 CPU 작업이라 스레드풀에서 실행
+        await run_in_threadpool(term_linker.rebuild, term_index.terms())
         
         return term_dict
     except HTTPException:
@@ -52,7 +110,13 @@ def add_term(term_data: TermCreate):
         print(f"Error in add_term: {e}")
         raise HTTPException(status_code=500, detail="Failed to add term")
 
+@router.post("/bulk")
+async def bulk_upsert_terms(request: Request, format: Optional[str] = Query(None, pattern="^(json|jsonl|csv)$")):
+    """용어 대량 생성/수정 (JSON 배열, JSONL, CSV), 행별 결과를 JSON Lines로 스트리밍"""
+    rows = await read_bulk_rows(request, format)
+    return import_response(_import_terms(rows))
+
 @router.options("/")
-def options_term():
+async def options_term():
     """OPTIONS 요청 처리"""
     return {"message": "OK"} 
\ No newline at end of file
@@ -1,62 +1,213 @@
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import List, Optional
 from datetime import datetime
-import json
+import os
+from firebase_admin import firestore
 
-from ..firebase_db import get_collection, get_document
+from ..firebase_db import get_collection, get_document, get_documents, get_firestore_client
 from ..firebase_models import FirebaseUserProgress
-from ..schemas import UserProgressCreate, UserProgressResponse
+from ..learned_set import LearnedSet, MAX_ITEMS_PER_DATE, catalogue_set
+from ..schemas import UserProgressAccepted, UserProgressCreate
+from ..write_coalescer import WriteCoalescer
+from .ai_info import get_item_counts
 
 router = APIRouter()
 
+# 같은 세션/날짜의 연속 저장을 모아 한 번에 쓰기까지 기다리는 시간 (초)
+PROGRESS_WRITE_DELAY = float(os.getenv('PROGRESS_WRITE_DELAY', '2.0'))
+# learned_info를 제외한 목록 조회용 필드
+SUMMARY_FIELDS = ['session_id', 'date', 'stats', 'quiz_score', 'created_at', 'updated_at']
+
+def progress_doc_id(session_id: str, date: str) -> str:
+    """세션/날짜별 결정적 문서 ID (같은 날 여러 번 저장해도 문서 1건)"""
+    return f"{session_id}_{date}"
+
+def _best_score(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+def merge_progress(current: dict, incoming: dict) -> dict:
+    """진행상황 병합 (학습 항목은 합집합, 퀴즈 점수는 최고점, 통계는 최신 값 우선)"""
+    merged = dict(current)
+    merged['learned_info'] = sorted(set(current.get('learned_info') or []) | set(incoming.get('learned_info') or []))
+    merged['quiz_score'] = _best_score(current.get('quiz_score'), incoming.get('quiz_score'))
+    if current.get('stats') or incoming.get('stats'):
+        merged['stats'] = {**(current.get('stats') or {}), **(incoming.get('stats') or {})}
+    return merged
+
+def _write_progress(key: tuple, pending: dict):
+    """대기 중이던 진행상황을 기존 문서와 병합해 저장
+
+    진행 문서와 학습 비트셋 문서는 한 트랜잭션에서 get_all 한 번으로 읽고 함께 씁니다.
+    리더보드 점수는 서버에서 채점하는 /quiz/submit에서만 기록합니다.
+    """
+    session_id, date = key
+    db = get_firestore_client()
+    if not db:
+        return
+    progress_ref = db.collection('user_progress').document(progress_doc_id(session_id, date))
+    learned_ref = db.collection('user_learned').document(session_id)
+    addition = LearnedSet.from_indices(date, pending.get('learned_info') or [])
+    
+    @firestore.transactional
+    def upsert(transaction):
+        refs = [progress_ref, learned_ref] if addition else [progress_ref]
+        snapshots = get_documents(refs, transaction=transaction)
+        snapshot = snapshots[progress_ref.path]
+        existing = snapshot.to_dict() if snapshot.exists else {}
+        merged = merge_progress(existing, pending)
+        now = datetime.now().isoformat()
+        merged.update({
+            'session_id': session_id,
+            'date': date,
+            'created_at': existing.get('created_at', pending['created_at']),
+            'updated_at': now
+        })
+        transaction.set(progress_ref, merged)
+        
+        # 사용자별 학습 비트셋에 해당 날짜 항목을 합집합으로 반영
+        if addition:
+            learned_snapshot = snapshots[learned_ref.path]
+            current = LearnedSet.from_dict(learned_snapshot.to_dict().get('bits')) if learned_snapshot.exists else LearnedSet()
+            learned = current | addition
+            transaction.set(learned_ref, {
+                'session_id': session_id,
+                'bits': learned.to_dict(),
+                'count': len(learned),
+                'updated_at': now
+            })
+    
+    upsert(db.transaction())
+
+# 프로세스 전역 진행상황 쓰기 합치기
+progress_writes = WriteCoalescer(_write_progress, merge_progress, delay=PROGRESS_WRITE_DELAY)
+
+def _get_learned_set(session_id: str) -> LearnedSet:
+    learned_ref = get_document('user_learned', session_id)
+    if not learned_ref:
+        return LearnedSet()
+    doc = learned_ref.get()
+    return LearnedSet.from_dict(doc.to_dict().get('bits')) if doc.exists else LearnedSet()
+
 @router.get("/{session_id}")
-def get_user_progress(session_id: str):
-    """사용자 진행상황 조회"""
+def get_user_progress(
+    session_id: str,
+    response: Response,
+    from_date: Optional[str] = Query(None, alias="from"),
+    to_date: Optional[str] = Query(None, alias="to"),
+    limit: int = Query(30, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_learned: bool = False
+):
+    """사용자 진행상황 조회 (최신 날짜순 페이지, 다음 페이지 커서는 X-Next-Cursor 헤더)
+
+    (session_id, date 내림차순) 복합 인덱스가 필요합니다.
+    """
     try:
         progress_collection = get_collection('user_progress')
         if not progress_collection:
             return []
         
         query = progress_collection.where('session_id', '==', session_id)
-        docs = query.stream()
+        if from_date:
+            query = query.where('date', '>=', from_date)
+        if to_date:
+            query = query.where('date', '<=', to_date)
+        query = query.order_by('date', direction=firestore.Query.DESCENDING)
+        if not include_learned:
+            query = query.select(SUMMARY_FIELDS)
+        if cursor:
+            cursor_doc = progress_collection.document(cursor).get()
+            if not cursor_doc.exists:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.start_after(cursor_doc)
+        
+        # 한 건 더 읽어 다음 페이지 존재 여부 확인
+        docs = list(query.limit(limit + 1).stream())
         
         progress_list = []
-        for doc in docs:
+        for doc in docs[:limit]:
             progress_data = doc.to_dict()
             progress_data['id'] = doc.id
             progress_list.append(progress_data)
         
+        if len(docs) > limit:
+            response.headers["X-Next-Cursor"] = docs[limit - 1].id
+        
         return progress_list
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_user_progress: {e}")
         return []
 
-@router.post("/", response_model=UserProgressResponse)
+@router.post("/", response_model=UserProgressAccepted, status_code=202)
 def add_user_progress(progress_data: UserProgressCreate):
-    """사용자 진행상황 추가"""
+    """사용자 진행상황 저장 요청 (세션/날짜별 1건으로 병합, 연속 저장은 모아서 write_delay초 뒤 기록)
+
+    저장은 응답 후에 이루어지므로 202를 반환합니다. 실패한 쓰기는 재시도하며
+    실패/유실 건수는 /api/system/write-queue에서 확인할 수 있습니다.
+    """
     try:
-        progress_collection = get_collection('user_progress')
-        if not progress_collection:
+        if not get_firestore_client():
             raise HTTPException(status_code=500, detail="Database connection failed")
         
+        if any(not 0 <= index < MAX_ITEMS_PER_DATE for index in progress_data.learned_info):
+            raise HTTPException(status_code=400, detail=f"learned_info indices must be in [0, {MAX_ITEMS_PER_DATE})")
+        
         progress_dict = {
             'session_id': progress_data.session_id,
             'date': progress_data.date,
-            'learned_info': json.dumps(progress_data.learned_info) if progress_data.learned_info else None,
+            'learned_info': progress_data.learned_info,
+            'stats': progress_data.stats,
             'quiz_score': progress_data.quiz_score,
             'created_at': datetime.now().isoformat()
         }
         
-        doc_ref = progress_collection.add(progress_dict)
-        progress_dict['id'] = doc_ref[1].id
-        
-        return progress_dict
+        # pending은 이 워커에서 아직 기록되지 않은 요청까지 병합한 값
+        merged = progress_writes.submit((progress_data.session_id, progress_data.date), progress_dict)
+        return {
+            'id': progress_doc_id(progress_data.session_id, progress_data.date),
+            'status': 'queued',
+            'write_delay': progress_writes.delay,
+            'pending': merged
+        }
     except HTTPException:
         raise
     except Exception as e:
         print(f"Error in add_user_progress: {e}")
         raise HTTPException(status_code=500, detail="Failed to add user progress")
 
+@router.get("/learned/{session_id}")
+def get_learned_items(session_id: str):
+    """사용자가 지금까지 학습한 항목 (비트셋 문서 1건 조회)"""
+    try:
+        learned = _get_learned_set(session_id)
+        return {"learned_count": len(learned), "learned": learned.indices()}
+    except Exception as e:
+        print(f"Error in get_learned_items: {e}")
+        return {"learned_count": 0, "learned": {}}
+
+@router.get("/remaining/{session_id}")
+def get_remaining_items(session_id: str):
+    """아직 학습하지 않은 항목 (전체 카탈로그와 학습 비트셋의 차집합)"""
+    try:
+        catalogue = catalogue_set(get_item_counts())
+        learned = _get_learned_set(session_id)
+        remaining = catalogue - learned
+        return {
+            "total_count": len(catalogue),
+            "learned_count": len(catalogue & learned),
+            "remaining_count": len(remaining),
+            "remaining": remaining.indices()
+        }
+    except Exception as e:
+        print(f"Error in get_remaining_items: {e}")
+        return {"total_count": 0, "learned_count": 0, "remaining_count": 0, "remaining": {}}
+
 @router.get("/stats/{session_id}")
 def get_user_stats(session_id: str):
     """사용자 통계 조회"""
@@ -68,21 +219,20 @@ def get_user_stats(session_id: str):
         query = progress_collection.where('session_id', '==', session_id)
         docs = query.stream()
         
-        total_days = 0
-        total_quiz_score = 0
-        scores = []
-        
+        # 이전 방식으로 같은 날짜에 여러 건 저장된 기록은 날짜별 최고점 1건으로 집계
+        best_by_date = {}
         for doc in docs:
             progress_data = doc.to_dict()
-            if progress_data.get('date') != '__stats__':
-                total_days += 1
-                if progress_data.get('quiz_score') is not None:
-                    total_quiz_score += progress_data['quiz_score']
-                    scores.append(progress_data['quiz_score'])
+            date = progress_data.get('date')
+            best_by_date[date] = _best_score(best_by_date.get(date), progress_data.get('quiz_score'))
+        
+        total_days = len(best_by_date)
+        scores = [score for score in best_by_date.values() if score is not None]
+        total_quiz_score = sum(scores)
         
         average_score = total_quiz_score / len(scores) if scores else 0
-    
-    return {
+        
+        return {
             "total_days": total_days,
             "total_quiz_score": total_quiz_score,
             "average_score": round(average_score, 2)
@@ -0,0 +1,197 @@
+import csv
+import io
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.background import BackgroundTask
+
+from .firebase_db import get_firestore_client
+from .replicas import replicas
+
+# Firestore 배치 1건의 최대 쓰기 수
+BULK_CHUNK_SIZE = 500
+BULK_PARALLELISM = int(os.getenv('BULK_PARALLELISM', '4'))
+MAX_BULK_ROWS = 10000
+FORMATS = ('json', 'jsonl', 'csv')
+
+def normalize_key(value) -> str:
+    """중복 판단용 키 정규화 (소문자, 공백 정리)"""
+    return re.sub(r'\s+', ' ', str(value or '')).strip().lower()
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    if requested:
+        return requested
+    content_type = (content_type or '').lower()
+    if 'csv' in content_type:
+        return 'csv'
+    if 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'jsonl'
+    return 'json'
+
+def parse_rows(body: bytes, fmt: str) -> List[dict]:
+    """JSON 배열, JSONL, CSV 본문을 행 목록으로 변환 (형식 오류는 ValueError)"""
+    text = body.decode('utf-8-sig')
+    if fmt == 'csv':
+        return [dict(row) for row in csv.DictReader(io.StringIO(text))]
+    if fmt == 'jsonl':
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get('items')
+    if not isinstance(data, list):
+        raise ValueError("JSON body must be an array or {\"items\": [...]}")
+    return data
+
+async def read_bulk_rows(request: Request, requested_format: Optional[str] = None) -> List[dict]:
+    """요청 본문(또는 multipart의 file 필드)을 행 목록으로 읽기"""
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith('multipart/form-data'):
+        form = await request.form()
+        upload = form.get('file')
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing file field")
+        body = await upload.read()
+        extension = (upload.filename or '').rsplit('.', 1)[-1].lower()
+        fmt = requested_format or (extension if extension in FORMATS else detect_format(upload.content_type))
+    else:
+        body = await request.body()
+        fmt = detect_format(content_type, requested_format)
+
+    try:
+        rows = parse_rows(body, fmt)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid {fmt} body: {e}")
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ROWS} rows per request")
+    if not all(isinstance(row, dict) for row in rows):
+        raise HTTPException(status_code=400, detail="Each row must be an object")
+    return rows
+
+class BulkImporter:
+    """대량 생성/수정 (일괄 검증 → 정규화 키로 중복 제거 → 청크 배치 병렬 커밋)
+
+    같은 키의 기존 문서가 있으면 그 문서를 수정하고, 없으면 새 문서를 만듭니다.
+    run()은 행별 결과를 커밋되는 순서대로 내보내는 제너레이터입니다.
+    """
+
+    def __init__(self, collection: str, schema: Type[BaseModel], key_fields: Sequence[str],
+                 prepare: Optional[Callable[[dict, bool], dict]] = None,
+                 after_chunk: Optional[Callable[[List[Tuple[str, dict, bool]]], None]] = None,
+                 chunk_size: int = BULK_CHUNK_SIZE, parallelism: int = BULK_PARALLELISM):
+        self.collection = collection
+        self.schema = schema
+        self.key_fields = tuple(key_fields)
+        self.prepare = prepare
+        self.after_chunk = after_chunk
+        self.chunk_size = chunk_size
+        self.parallelism = parallelism
+
+    def _key(self, data: dict) -> tuple:
+        return tuple(normalize_key(data.get(field)) for field in self.key_fields)
+
+    def _existing_ids(self, db) -> Dict[tuple, str]:
+        """기존 문서의 정규화 키 → 문서 ID (복제본이 있으면 Firestore 조회 없음)"""
+        replica = replicas[self.collection]
+        if replica.ready:
+            return {self._key(row): row['id'] for row in replica.all()}
+        query = db.collection(self.collection).select(list(self.key_fields))
+        return {self._key(doc.to_dict()): doc.id for doc in query.stream()}
+
+    def _commit(self, db, chunk: List[Tuple[int, str, dict, bool]]) -> List[dict]:
+        collection = db.collection(self.collection)
+        batch = db.batch()
+        for _, doc_id, data, created in chunk:
+            batch.set(collection.document(doc_id), data, merge=not created)
+        try:
+            batch.commit()
+        except Exception as e:
+            print(f"❌ 대량 쓰기 청크 실패 ({self.collection}): {e}")
+            return [{'row': row, 'status': 'failed', 'id': doc_id, 'error': str(e)} for row, doc_id, _, _ in chunk]
+
+        replica = replicas[self.collection]
+        for _, doc_id, data, _ in chunk:
+            replica.upsert(doc_id, {**(replica.get(doc_id) or {}), **data})
+        if self.after_chunk:
+            try:
+                self.after_chunk([(doc_id, data, created) for _, doc_id, data, created in chunk])
+            except Exception as e:
+                print(f"⚠️ 대량 쓰기 후처리 실패 ({self.collection}): {e}")
+        return [
+            {'row': row, 'status': 'created' if created else 'updated', 'id': doc_id}
+            for row, doc_id, _, created in chunk
+        ]
+
+    def run(self, rows: List[dict]) -> Iterator[dict]:
+        counts = {'created': 0, 'updated': 0, 'duplicate': 0, 'invalid': 0, 'failed': 0}
+
+        def emit(result: dict) -> dict:
+            counts[result['status']] += 1
+            return result
+
+        db = get_firestore_client()
+        if not db:
+            yield {'error': 'Database connection failed'}
+            return
+
+        # 1. 일괄 검증과 업로드 내 중복 제거 (같은 키는 처음 나온 행만 사용)
+        valid: List[Tuple[int, tuple, dict]] = []
+        seen = set()
+        for row_number, raw in enumerate(rows):
+            try:
+                data = self.schema.model_validate(raw).model_dump()
+            except ValidationError as e:
+                yield emit({'row': row_number, 'status': 'invalid', 'error': e.errors(include_url=False)})
+                continue
+            key = self._key(data)
+            if key in seen:
+                yield emit({'row': row_number, 'status': 'duplicate'})
+                continue
+            seen.add(key)
+            valid.append((row_number, key, data))
+
+        # 2. 기존 문서와 대조해 생성/수정 결정
+        existing = self._existing_ids(db) if valid else {}
+        writes = []
+        for row_number, key, data in valid:
+            doc_id = existing.get(key)
+            created = doc_id is None
+            if created:
+                doc_id = db.collection(self.collection).document().id
+            if self.prepare:
+                data = self.prepare(data, created)
+            writes.append((row_number, doc_id, data, created))
+
+        # 3. 청크 단위 배치를 병렬로 커밋하고 끝나는 순서대로 결과 전송
+        chunks = [writes[i:i + self.chunk_size] for i in range(0, len(writes), self.chunk_size)]
+        with ThreadPoolExecutor(max_workers=max(1, min(self.parallelism, len(chunks) or 1))) as executor:
+            futures = [executor.submit(self._commit, db, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                for result in future.result():
+                    yield emit(result)
+
+        yield {'summary': counts, 'total': len(rows)}
+
+def ndjson_lines(results: Iterator[dict]) -> Iterator[str]:
+    """StreamingResponse용 JSON Lines 변환"""
+    for result in results:
+        yield json.dumps(result, ensure_ascii=False, default=str) + '\n'
+
+def _drain(results: Iterator[dict]):
+    for _ in results:
+        pass
+
+def import_response(results: Iterator[dict]) -> StreamingResponse:
+    """행별 결과를 JSON Lines로 스트리밍
+
+    클라이언트가 중간에 연결을 끊으면 스트리밍은 멈추지만, 응답 후 백그라운드 작업이
+    남은 결과를 끝까지 소비하므로 가져오기와 그 뒤의 인덱스 재구성은 항상 실행됩니다.
+    """
+    return StreamingResponse(
+        ndjson_lines(results), media_type="application/x-ndjson", background=BackgroundTask(_drain, results)
+    )
@@ -0,0 +1,356 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set
+
+_MISSING = object()
+
+class TTLCache:
+    """LRU + TTL 기반 프로세스 내 캐시"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+# 같은 호스트의 워커들이 공유하는 2차 캐시 파일 (빈 값이면 사용 안 함)
+# 다른 사용자가 쓸 수 없도록 앱 디렉토리 아래 전용 폴더(0700)와 파일(0600)을 사용
+DEFAULT_SHARED_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'shared_cache.sqlite3'
+)
+SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH', DEFAULT_SHARED_CACHE_PATH)
+SHARED_CACHE_MAXSIZE = int(os.getenv('SHARED_CACHE_MAXSIZE', '20000'))
+# 다른 워커의 무효화를 확인하는 간격 (초)
+VERSION_CHECK_INTERVAL = 1.0
+# 크기 제한 확인은 쓰기 N번마다 한 번
+EVICT_EVERY = 200
+# 키 단위 삭제 기록 보관 시간 (초, 모든 워커가 확인할 시간보다 충분히 길게)
+TOMBSTONE_TTL = 300
+
+class SharedDiskCache:
+    """SQLite 파일 기반 워커 간 공유 캐시 (TTL + 크기 제한, 네임스페이스 버전과 키 삭제 기록으로 무효화)
+
+    값은 JSON으로 저장합니다 (파일을 조작해도 코드가 실행되지 않도록 pickle 사용 안 함).
+    항목은 저장 당시의 네임스페이스 버전을 함께 기록하고, clear로 버전이 올라가면
+    이전 버전 항목은 모든 워커에서 즉시 무효가 됩니다. 키 1개 삭제는 해당 행만 지우고
+    삭제 기록(tombstone)을 남겨 다른 워커가 1차 캐시에서도 지우게 합니다.
+    set에 조회 시작 시점의 버전과 시각을 넘기면 그 뒤에 무효화/삭제가 있었을 때 저장하지 않습니다.
+    크기 제한을 넘으면 만료가 가까운 항목부터 제거합니다.
+    """
+
+    def __init__(self, path: str, maxsize: int = SHARED_CACHE_MAXSIZE):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._writes = 0
+
+    def _prepare_path(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        # 파일을 미리 0600으로 만들어 두면 SQLite의 -wal/-shm 파일도 같은 권한으로 생성됨
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        os.close(fd)
+        if os.stat(self.path).st_uid != os.getuid():
+            raise PermissionError(f"Shared cache file is owned by another user: {self.path}")
+        os.chmod(self.path, 0o600)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self._init_lock:
+                if not self._initialized:
+                    self._prepare_path()
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS cache_entries ('
+                    'namespace TEXT, key TEXT, value TEXT, version INTEGER, '
+                    'expires_at REAL, PRIMARY KEY (namespace, key))'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires_at)')
+                conn.execute('CREATE TABLE IF NOT EXISTS cache_namespaces (name TEXT PRIMARY KEY, version INTEGER)')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS cache_tombstones ('
+                    'namespace TEXT, key TEXT, deleted_at REAL, PRIMARY KEY (namespace, key))'
+                )
+                self._initialized = True
+        return conn
+
+    def version(self, namespace: str) -> int:
+        row = self._conn().execute('SELECT version FROM cache_namespaces WHERE name = ?', (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def get(self, namespace: str, key: str) -> Any:
+        """(값, 남은 TTL 초) 또는 _MISSING"""
+        # 조회는 읽기만 함 (적중할 때마다 쓰기를 하지 않음)
+        now = time.time()
+        row = self._conn().execute(
+            'SELECT e.value, e.expires_at FROM cache_entries e LEFT JOIN cache_namespaces n ON n.name = e.namespace '
+            'WHERE e.namespace = ? AND e.key = ? AND e.expires_at > ? AND e.version = COALESCE(n.version, 0)',
+            (namespace, key, now)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        return json.loads(row[0]), row[1] - now
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float,
+            version: Optional[int] = None, since: Optional[float] = None) -> bool:
+        """저장 (version/since를 주면 그 버전이 그대로이고 since 이후 이 키의 삭제 기록이 없을 때만 저장)"""
+        data = json.dumps(value, ensure_ascii=False)
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            current = conn.execute(
+                'SELECT COALESCE(MAX(version), 0) FROM cache_namespaces WHERE name = ?', (namespace,)
+            ).fetchone()[0]
+            if version is not None and (current != version or conn.execute(
+                'SELECT 1 FROM cache_tombstones WHERE namespace = ? AND key = ? AND deleted_at >= ?',
+                (namespace, key, since)
+            ).fetchone()):
+                # 조회하는 동안 다른 워커가 무효화/삭제함 (조회한 값이 이미 오래됐을 수 있음)
+                conn.execute('ROLLBACK')
+                return False
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (namespace, key, value, version, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (namespace, key, data, current, time.time() + ttl)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+        return True
+
+    def evict(self):
+        """만료 항목, 오래된 삭제 기록, 크기 제한을 넘는 항목 제거"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (now,))
+            conn.execute('DELETE FROM cache_tombstones WHERE deleted_at <= ?', (now - TOMBSTONE_TTL,))
+            conn.execute(
+                'DELETE FROM cache_entries WHERE rowid IN (SELECT rowid FROM cache_entries ORDER BY expires_at LIMIT '
+                '(SELECT MAX(COUNT(*) - ?, 0) FROM cache_entries))',
+                (self.maxsize,)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def delete(self, namespace: str, key: str):
+        """키 1개 삭제 (다른 워커가 1차 캐시에서도 지우도록 삭제 기록을 남김)"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (namespace, key))
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_tombstones (namespace, key, deleted_at) VALUES (?, ?, ?)',
+                (namespace, key, time.time())
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def deleted_since(self, namespace: str, since: float) -> Set[str]:
+        rows = self._conn().execute(
+            'SELECT key FROM cache_tombstones WHERE namespace = ? AND deleted_at >= ?', (namespace, since)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def invalidate(self, namespace: str):
+        """네임스페이스 버전을 올려 모든 워커의 기존 항목 무효화"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT INTO cache_namespaces (name, version) VALUES (?, 1) '
+                'ON CONFLICT(name) DO UPDATE SET version = version + 1',
+                (namespace,)
+            )
+            conn.execute('DELETE FROM cache_entries WHERE namespace = ?', (namespace,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+shared_cache = SharedDiskCache(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None
+
+# 통계 조회용 2단계 캐시 목록
+tiered_caches: Dict[str, 'TieredCache'] = {}
+
+class TieredCache(TTLCache):
+    """프로세스 내 LRU(1차) 뒤에 워커 간 공유 디스크 캐시(2차)를 둔 캐시
+
+    초기화는 네임스페이스 버전을, 키 삭제는 삭제 기록을 통해 다른 워커의 1차 캐시까지 무효화합니다.
+    get이 놓친 키는 그때의 버전과 시각을 기억해 두고, 이어지는 set은 그 사이에 무효화/삭제가
+    있었으면 버립니다 (무효화 전에 읽은 값이 나중에 저장되는 것 방지).
+    공유 캐시를 쓸 수 없으면 1차 캐시만으로 동작합니다.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 300,
+                 shared: Optional[SharedDiskCache] = None):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.namespace = namespace
+        self.shared = shared if shared is not None else shared_cache
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self._version = 0
+        self._version_checked_at = 0.0
+        self._tombstones_checked_at = time.time()
+        # 키별 첫 조회 실패 시점의 (네임스페이스 버전, 시각)
+        self._miss_marks: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        tiered_caches[namespace] = self
+
+    def _shared_call(self, method: str, *args):
+        try:
+            return getattr(self.shared, method)(self.namespace, *args)
+        except Exception as e:
+            print(f"❌ 공유 캐시 오류 ({self.namespace}.{method}): {e}")
+            return _MISSING
+
+    def _sync_version(self):
+        """다른 워커가 무효화/삭제했으면 1차 캐시에서도 제거 (확인은 최대 1초에 1번)"""
+        now = time.monotonic()
+        if now - self._version_checked_at < VERSION_CHECK_INTERVAL:
+            return
+        self._version_checked_at = now
+        version = self._shared_call('version')
+        if version is not _MISSING and version != self._version:
+            self._version = version
+            TTLCache.clear(self)
+        checked_at = time.time()
+        deleted = self._shared_call('deleted_since', self._tombstones_checked_at - VERSION_CHECK_INTERVAL)
+        if deleted is not _MISSING:
+            self._tombstones_checked_at = checked_at
+            if deleted:
+                with self._lock:
+                    for key in [key for key in self._data if self._key(key) in deleted]:
+                        del self._data[key]
+
+    def _key(self, key: Hashable) -> str:
+        return repr(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if self.shared is None:
+            return super().get(key, default)
+        self._sync_version()
+        value = super().get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        entry = self._shared_call('get', self._key(key))
+        if entry is _MISSING:
+            self.shared_misses += 1
+            self._mark_miss(key)
+            return default
+        self.shared_hits += 1
+        value, remaining = entry
+        # 공유 캐시 항목의 남은 시간만큼만 1차 캐시에 보관
+        TTLCache.set(self, key, value, min(self.ttl, remaining))
+        return value
+
+    def _mark_miss(self, key: Hashable):
+        version = self._shared_call('version')
+        if version is _MISSING:
+            return
+        with self._lock:
+            # 동시에 놓친 요청이 여럿이면 가장 이른 시점을 유지 (늦게 읽은 값도 보수적으로 판단)
+            if key not in self._miss_marks:
+                self._miss_marks[key] = (version, time.time())
+                while len(self._miss_marks) > self.maxsize:
+                    self._miss_marks.popitem(last=False)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.shared is not None:
+            with self._lock:
+                mark = self._miss_marks.pop(key, None)
+            version, since = mark if mark else (None, None)
+            stored = self._shared_call('set', self._key(key), value, self.ttl if ttl is None else ttl, version, since)
+            if stored is False:
+                return
+        super().set(key, value, ttl)
+
+    def delete(self, key: Hashable):
+        super().delete(key)
+        if self.shared is not None:
+            self._shared_call('delete', self._key(key))
+
+    def clear(self):
+        super().clear()
+        if self.shared is not None:
+            self._shared_call('invalidate')
+            self._version_checked_at = 0.0
+
+    def stats(self) -> dict:
+        memory = super().stats()
+        shared_total = self.shared_hits + self.shared_misses
+        return {
+            "memory": memory,
+            "shared": {
+                "enabled": self.shared is not None,
+                "hits": self.shared_hits,
+                "misses": self.shared_misses,
+                "hit_rate": round(self.shared_hits / shared_total, 4) if shared_total else 0.0
+            }
+        }
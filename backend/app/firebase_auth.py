@@ -1,8 +1,8 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Iterator, List, Optional
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from .firebase_db import get_collection, get_document
+from .firebase_db import get_collection, get_document, scan_collection
 from .firebase_models import FirebaseUser
 
 # 비밀번호 해싱 설정
@@ -161,26 +161,10 @@ def delete_user(user_id: str) -> bool:
         print(f"❌ 사용자 삭제 실패: {e}")
         return False
 
-def get_all_users() -> list[FirebaseUser]:
-    """모든 사용자 조회"""
-    try:
-        users_ref = get_collection('users')
-        if not users_ref:
-            return []
-        
-        users = []
-        docs = users_ref.stream()
-        
-        for doc in docs:
-            user_data = doc.to_dict()
-            user = FirebaseUser.from_dict(user_data, doc.id)
-            users.append(user)
-        
-        return users
-        
-    except Exception as e:
-        print(f"❌ 모든 사용자 조회 실패: {e}")
-        return []
+def iter_users(fields: List[str]) -> Iterator[dict]:
+    """지정한 필드만 페이지 단위로 읽어 사용자를 하나씩 반환 (문서 ID는 id로 포함, 비밀번호 해시 등은 읽지 않음)"""
+    for doc in scan_collection('users', fields=fields):
+        yield {**doc.to_dict(), 'id': doc.id}
 
 def authenticate_user(username: str, password: str) -> Optional[FirebaseUser]:
     """사용자 인증"""
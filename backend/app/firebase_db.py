@@ -1,8 +1,12 @@
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
 import os
 import json
-from typing import Optional
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+from google.api_core import exceptions as api_exceptions
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
 
 # Firebase 초기화 (한 번만 실행)
 def initialize_firebase():
@@ -113,4 +117,166 @@ def get_document(collection_name: str, document_id: str):
         return None
     except Exception as e:
         print(f"❌ 문서 참조 생성 실패: {e}")
-        return None 
\ No newline at end of file
+        return None
+
+# 비동기 Firestore 클라이언트 가져오기
+def get_async_firestore_client():
+    """비동기 Firestore 클라이언트 반환 (이벤트 루프를 막지 않고 await로 호출)"""
+    try:
+        if not firebase_admin._apps:
+            initialize_firebase()
+        return firestore_async.client()
+    except Exception as e:
+        print(f"❌ 비동기 Firestore 클라이언트 생성 실패: {e}")
+        return None
+
+# 비동기 컬렉션 참조 가져오기
+def get_async_collection(collection_name: str):
+    """특정 컬렉션의 비동기 참조 반환"""
+    try:
+        db = get_async_firestore_client()
+        if db:
+            return db.collection(collection_name)
+        return None
+    except Exception as e:
+        print(f"❌ 비동기 컬렉션 참조 생성 실패: {e}")
+        return None
+
+# 비동기 문서 참조 가져오기
+def get_async_document(collection_name: str, document_id: str):
+    """특정 문서의 비동기 참조 반환"""
+    try:
+        db = get_async_firestore_client()
+        if db:
+            return db.collection(collection_name).document(document_id)
+        return None
+    except Exception as e:
+        print(f"❌ 비동기 문서 참조 생성 실패: {e}")
+        return None
+
+# 비동기 데이터베이스 연결 테스트
+async def async_test_connection():
+    """Firebase 연결 테스트 (비동기)"""
+    try:
+        db = get_async_firestore_client()
+        if db:
+            test_doc = db.collection('test').document('connection_test')
+            await test_doc.set({'status': 'connected', 'timestamp': firestore.SERVER_TIMESTAMP})
+            await test_doc.delete()
+            print("✅ Firebase 연결 성공")
+            return True
+        return False
+    except Exception as e:
+        print(f"❌ Firebase 연결 테스트 실패: {e}")
+        return False
+
+# 문서 여러 건 일괄 조회
+def get_documents(refs: Iterable, fields: Optional[List[str]] = None, transaction=None) -> Dict[str, object]:
+    """문서 참조 여러 건을 get_all 한 번으로 조회 (문서 경로 → 스냅샷)
+
+    없는 문서도 exists=False 스냅샷으로 들어 있고, 같은 경로는 한 번만 요청합니다.
+    fields를 주면 해당 필드만, transaction을 주면 트랜잭션 안에서 읽습니다.
+    """
+    refs = list({ref.path: ref for ref in refs}.values())
+    if not refs:
+        return {}
+    if transaction is not None:
+        snapshots = transaction.get_all(refs)
+    else:
+        db = get_firestore_client()
+        if not db:
+            raise RuntimeError("Firestore client unavailable")
+        snapshots = db.get_all(refs, field_paths=fields)
+    return {snapshot.reference.path: snapshot for snapshot in snapshots}
+
+# 문서 버전 (If-Match / ETag)
+def document_version(update_time) -> Optional[str]:
+    """문서 update_time을 버전 문자열(RFC 3339, 나노초 포함)로 변환"""
+    return update_time.rfc3339() if update_time else None
+
+def precondition_option(db, version: Optional[str]):
+    """If-Match 버전을 last_update_time 사전 조건으로 변환
+
+    버전이 없으면 None을 반환하며, 이 경우 update()의 기본 사전 조건(exists=True)이 적용됩니다.
+    형식이 잘못된 버전은 ValueError.
+    """
+    if not version:
+        return None
+    last_update_time = DatetimeWithNanoseconds.from_rfc3339(version.strip().strip('"'))
+    return db.write_option(last_update_time=last_update_time)
+
+# 컬렉션 페이지 단위 스캔
+SCAN_PAGE_SIZE = 500
+SCAN_MAX_RETRIES = 5
+# 재시도할 일시적 오류 (스트림 기한 초과, 서버 과부하 등)
+TRANSIENT_ERRORS = (
+    api_exceptions.DeadlineExceeded,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.InternalServerError,
+    api_exceptions.Aborted,
+    api_exceptions.ResourceExhausted,
+)
+
+def _scan_query(source, page_size: int, fields: Optional[List[str]], cursor):
+    # 문서 이름을 마지막 정렬 기준으로 두어 커서가 항상 유일하도록 함
+    query = source.order_by('__name__')
+    if fields is not None:
+        query = query.select(fields)
+    query = query.limit(page_size)
+    return query.start_after(cursor) if cursor is not None else query
+
+def scan_collection(source, page_size: int = SCAN_PAGE_SIZE, fields: Optional[List[str]] = None,
+                    max_retries: int = SCAN_MAX_RETRIES) -> Iterator:
+    """컬렉션(또는 쿼리)을 limit + start_after 페이지로 나눠 문서를 하나씩 반환
+
+    한 번에 한 페이지만 메모리에 두고, 일시적 오류가 나면 마지막 커서부터 다시 읽습니다.
+    fields를 주면 해당 필드만 조회합니다 (빈 목록이면 문서 ID만).
+    source는 컬렉션 이름, 컬렉션 참조 또는 where 조건이 붙은 쿼리입니다.
+    """
+    if isinstance(source, str):
+        source = get_collection(source)
+        if source is None:
+            return
+    cursor = None
+    retries = 0
+    while True:
+        try:
+            docs = list(_scan_query(source, page_size, fields, cursor).stream())
+        except TRANSIENT_ERRORS as e:
+            retries += 1
+            if retries > max_retries:
+                raise
+            print(f"⚠️ 스캔 재시도 {retries}/{max_retries}: {e}")
+            time.sleep(min(2 ** retries * 0.1, 5))
+            continue
+        retries = 0
+        yield from docs
+        if len(docs) < page_size:
+            return
+        cursor = docs[-1]
+
+async def async_scan_collection(source, page_size: int = SCAN_PAGE_SIZE, fields: Optional[List[str]] = None,
+                                max_retries: int = SCAN_MAX_RETRIES) -> AsyncIterator:
+    """scan_collection의 비동기 버전 (AsyncClient 컬렉션/쿼리용)"""
+    if isinstance(source, str):
+        source = get_async_collection(source)
+        if source is None:
+            return
+    cursor = None
+    retries = 0
+    while True:
+        try:
+            docs = [doc async for doc in _scan_query(source, page_size, fields, cursor).stream()]
+        except TRANSIENT_ERRORS as e:
+            retries += 1
+            if retries > max_retries:
+                raise
+            print(f"⚠️ 스캔 재시도 {retries}/{max_retries}: {e}")
+            await asyncio.sleep(min(2 ** retries * 0.1, 5))
+            continue
+        retries = 0
+        for doc in docs:
+            yield doc
+        if len(docs) < page_size:
+            return
+        cursor = docs[-1]
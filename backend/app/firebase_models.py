@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import json
 from pydantic import BaseModel
 from .firebase_db import get_collection, get_document
 
@@ -15,6 +16,11 @@ class FirebaseUser:
         self.created_at = created_at or datetime.now()
         self.user_id = user_id
     
+    @property
+    def id(self) -> Optional[str]:
+        """응답 스키마(UserResponse.id)용 문서 ID"""
+        return self.user_id
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any], user_id: str):
         """Firestore 문서에서 사용자 객체 생성"""
@@ -82,56 +88,109 @@ class FirebaseActivityLog:
             'created_at': self.created_at
         }
 
-# Firebase 기반 AI 정보 모델
-class FirebaseAIInfo:
-    def __init__(self, date: str, info1_title: Optional[str] = None,
-                 info1_content: Optional[str] = None, info1_terms: Optional[str] = None,
-                 info2_title: Optional[str] = None, info2_content: Optional[str] = None,
-                 info2_terms: Optional[str] = None, info3_title: Optional[str] = None,
-                 info3_content: Optional[str] = None, info3_terms: Optional[str] = None,
-                 created_at: Optional[datetime] = None):
+def decode_terms(value: Any) -> List[Dict[str, Any]]:
+    """용어 목록 읽기 (네이티브 배열과 기존 JSON 문자열 모두 지원)"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return []
+    if not isinstance(value, list):
+        return []
+    return [term for term in value if isinstance(term, dict)]
+
+# AI 정보 항목 하위 컬렉션 이름 (컬렉션 그룹 쿼리가 다른 컬렉션의 하위 컬렉션과 겹치지 않도록 고유한 이름 사용)
+AI_INFO_ITEMS = 'ai_info_items'
+
+# Firebase 기반 AI 정보 항목 모델 (ai_info/{date}/ai_info_items 하위 컬렉션)
+class FirebaseAIInfoItem:
+    def __init__(self, date: str, index: int, title: str, content: str,
+                 terms: Optional[List[Dict[str, Any]]] = None,
+                 links: Optional[List[Dict[str, Any]]] = None):
         self.date = date
-        self.info1_title = info1_title
-        self.info1_content = info1_content
-        self.info1_terms = info1_terms
-        self.info2_title = info2_title
-        self.info2_content = info2_content
-        self.info2_terms = info2_terms
-        self.info3_title = info3_title
-        self.info3_content = info3_content
-        self.info3_terms = info3_terms
-        self.created_at = created_at or datetime.now()
+        self.index = index
+        self.title = title
+        self.content = content
+        self.terms = terms or []
+        self.links = links or []
+    
+    @property
+    def doc_id(self) -> str:
+        """정렬 가능한 하위 문서 ID"""
+        return f"{self.index:03d}"
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]):
-        """Firestore 문서에서 AI 정보 객체 생성"""
+        """Firestore 문서에서 AI 정보 항목 객체 생성"""
         return cls(
             date=data.get('date', ''),
-            info1_title=data.get('info1_title'),
-            info1_content=data.get('info1_content'),
-            info1_terms=data.get('info1_terms'),
-            info2_title=data.get('info2_title'),
-            info2_content=data.get('info2_content'),
-            info2_terms=data.get('info2_terms'),
-            info3_title=data.get('info3_title'),
-            info3_content=data.get('info3_content'),
-            info3_terms=data.get('info3_terms'),
-            created_at=data.get('created_at')
+            index=data.get('index', 0),
+            title=data.get('title', ''),
+            content=data.get('content', ''),
+            terms=decode_terms(data.get('terms')),
+            links=data.get('links')
         )
     
     def to_dict(self) -> Dict[str, Any]:
-        """AI 정보 객체를 Firestore 문서로 변환"""
+        """AI 정보 항목 객체를 Firestore 문서로 변환"""
+        return {
+            'date': self.date,
+            'index': self.index,
+            'title': self.title,
+            'content': self.content,
+            'terms': self.terms,
+            'links': self.links
+        }
+    
+    def summary(self) -> Dict[str, Any]:
+        """목록/달력 화면용 요약"""
+        return {'index': self.index, 'title': self.title, 'term_count': len(self.terms)}
+
+# Firebase 기반 AI 정보 모델 (날짜별 요약 문서)
+class FirebaseAIInfo:
+    def __init__(self, date: str, items: Optional[List[FirebaseAIInfoItem]] = None,
+                 summaries: Optional[List[Dict[str, Any]]] = None,
+                 created_at: Optional[datetime] = None):
+        self.date = date
+        self.items = items or []
+        self.summaries = summaries if summaries is not None else [item.summary() for item in self.items]
+        self.created_at = created_at or datetime.now()
+    
+    @property
+    def has_inline_items(self) -> bool:
+        """항목 본문이 문서 안에 있는 기존 형식인지 여부"""
+        return bool(self.items)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Firestore 문서에서 AI 정보 객체 생성 (기존 info1..info3 형식 포함)"""
+        date = data.get('date', '')
+        if 'summaries' in data:
+            return cls(date=date, summaries=data.get('summaries') or [], created_at=data.get('created_at'))
+        
+        items = []
+        for n in (1, 2, 3):
+            title = data.get(f'info{n}_title')
+            content = data.get(f'info{n}_content')
+            if title and content:
+                items.append(FirebaseAIInfoItem(
+                    date=date,
+                    index=len(items),
+                    title=title,
+                    content=content,
+                    terms=decode_terms(data.get(f'info{n}_terms')),
+                    links=data.get(f'info{n}_links')
+                ))
+        return cls(date=date, items=items, created_at=data.get('created_at'))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """AI 정보 객체를 Firestore 문서로 변환 (본문은 items 하위 컬렉션에 저장)"""
         return {
             'date': self.date,
-            'info1_title': self.info1_title,
-            'info1_content': self.info1_content,
-            'info1_terms': self.info1_terms,
-            'info2_title': self.info2_title,
-            'info2_content': self.info2_content,
-            'info2_terms': self.info2_terms,
-            'info3_title': self.info3_title,
-            'info3_content': self.info3_content,
-            'info3_terms': self.info3_terms,
+            'item_count': len(self.summaries),
+            'summaries': self.summaries,
             'created_at': self.created_at
         }
 
@@ -0,0 +1,283 @@
+import random
+import threading
+import time
+from datetime import date as date_type, datetime
+from typing import Dict, List, Optional
+
+from firebase_admin import firestore
+
+from .firebase_db import get_firestore_client
+
+PERIODS = ('daily', 'weekly', 'all')
+# 기간/사용자별 점수 문서 (한 문서에 모든 사용자 점수를 모으면 쓰기 한도와 1MiB 제한에 걸림)
+ENTRY_COLLECTION = 'leaderboard_entries'
+# 메모리에 캐시하는 기간별 상위 인원 수와 캐시 유지 시간 (다른 워커의 기록은 이 시간 뒤에 반영)
+TOP_CACHE_SIZE = 100
+CACHE_SECONDS = 60
+MAX_LEVEL = 24
+
+class IndexableSkipList:
+    """순위 조회가 O(log n)인 정렬 스킵 리스트 (각 링크에 건너뛰는 원소 수를 기록)"""
+
+    def __init__(self):
+        self.head = [None, [None] * MAX_LEVEL, [0] * MAX_LEVEL]
+        self.level = 1
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key: tuple):
+        update = [None] * MAX_LEVEL
+        rank = [0] * MAX_LEVEL
+        node = self.head
+        for i in range(MAX_LEVEL - 1, -1, -1):
+            rank[i] = rank[i + 1] if i + 1 < MAX_LEVEL else 0
+            while node[1][i] is not None and node[1][i][0] < key:
+                rank[i] += node[2][i]
+                node = node[1][i]
+            update[i] = node
+
+        level = self._random_level()
+        self.level = max(self.level, level)
+        new_node = [key, [None] * level, [0] * level]
+        for i in range(MAX_LEVEL):
+            if i < level:
+                new_node[1][i] = update[i][1][i]
+                update[i][1][i] = new_node
+                new_node[2][i] = update[i][2][i] - (rank[0] - rank[i])
+                update[i][2][i] = rank[0] - rank[i] + 1
+            else:
+                update[i][2][i] += 1
+        self.size += 1
+
+    def remove(self, key: tuple) -> bool:
+        update = [None] * MAX_LEVEL
+        node = self.head
+        for i in range(MAX_LEVEL - 1, -1, -1):
+            while node[1][i] is not None and node[1][i][0] < key:
+                node = node[1][i]
+            update[i] = node
+        target = node[1][0]
+        if target is None or target[0] != key:
+            return False
+        for i in range(MAX_LEVEL):
+            if update[i][1][i] is target:
+                update[i][2][i] += target[2][i] - 1
+                update[i][1][i] = target[1][i]
+            else:
+                update[i][2][i] -= 1
+        self.size -= 1
+        return True
+
+    def count_less(self, key: tuple) -> int:
+        """key보다 작은 원소 수"""
+        position = 0
+        node = self.head
+        for i in range(MAX_LEVEL - 1, -1, -1):
+            while node[1][i] is not None and node[1][i][0] < key:
+                position += node[2][i]
+                node = node[1][i]
+        return position
+
+    def rank(self, key: tuple) -> Optional[int]:
+        """0부터 시작하는 순위 (없으면 None)"""
+        position = 0
+        node = self.head
+        for i in range(MAX_LEVEL - 1, -1, -1):
+            while node[1][i] is not None and node[1][i][0] <= key:
+                position += node[2][i]
+                node = node[1][i]
+            if node is not self.head and node[0] == key:
+                return position - 1
+        return None
+
+    def slice(self, start: int, count: int) -> List[tuple]:
+        """start 순위부터 count개"""
+        node = self.head
+        position = 0
+        target = start + 1
+        for i in range(MAX_LEVEL - 1, -1, -1):
+            while node[1][i] is not None and position + node[2][i] <= target:
+                position += node[2][i]
+                node = node[1][i]
+        if position != target:
+            return []
+        result = []
+        while node is not None and len(result) < count:
+            result.append(node[0])
+            node = node[1][0]
+        return result
+
+class Board:
+    """기간별 상위 점수 캐시 (점수 내림차순, 동점은 session_id 순)
+
+    Firestore에서 읽은 상위 TOP_CACHE_SIZE명과 기간 전체 인원 수만 담습니다.
+    점수는 오르기만 하므로 캐시에 있는 사용자의 점수가 오르면 그대로 반영해도 상위 목록이 유지됩니다.
+    """
+
+    def __init__(self, scores: Optional[Dict[str, float]] = None, total: int = 0):
+        self.scores: Dict[str, float] = {}
+        self.ranking = IndexableSkipList()
+        self.total = total
+        self.loaded_at = time.monotonic()
+        for session_id, score in (scores or {}).items():
+            self.set_score(session_id, score)
+
+    def set_score(self, session_id: str, score: float):
+        previous = self.scores.get(session_id)
+        if previous is not None:
+            self.ranking.remove((-previous, session_id))
+        self.scores[session_id] = score
+        self.ranking.insert((-score, session_id))
+
+    def add_score(self, session_id: str, delta: float):
+        self.set_score(session_id, self.scores.get(session_id, 0) + delta)
+
+    def rank(self, score: float) -> int:
+        """1부터 시작하는 순위 (동점은 같은 순위, 더 높은 점수 수 + 1)"""
+        return self.ranking.count_less((-score, '')) + 1
+
+    def top(self, limit: int) -> List[dict]:
+        return [
+            {'rank': self.rank(-neg_score), 'session_id': session_id, 'score': -neg_score}
+            for neg_score, session_id in self.ranking.slice(0, limit)
+        ]
+
+    def position(self, session_id: str) -> Optional[dict]:
+        score = self.scores.get(session_id)
+        if score is None:
+            return None
+        return {'rank': self.rank(score), 'session_id': session_id, 'score': score, 'total': self.total}
+
+def entry_doc_id(key: str, session_id: str) -> str:
+    return f"{key}_{session_id}"
+
+def period_keys(day: str) -> Dict[str, str]:
+    """날짜가 속한 기간별 점수판 키"""
+    parsed = datetime.strptime(day, "%Y-%m-%d").date() if day else date_type.today()
+    year, week, _ = parsed.isocalendar()
+    return {
+        'daily': f"daily_{parsed.isoformat()}",
+        'weekly': f"weekly_{year}-W{week:02d}",
+        'all': "all"
+    }
+
+def _count(query) -> int:
+    """count() 집계 쿼리 (문서를 읽지 않고 인덱스 항목 수만 셈)"""
+    return int(query.count().get()[0][0].value)
+
+class LeaderboardManager:
+    """Firestore 점수 문서(leaderboard_entries/{기간 키}_{세션})로 순위를 계산하고 상위 목록은 메모리에 캐시
+
+    상위 N명은 score 내림차순 limit 쿼리, 개인 순위는 더 높은 점수의 count() 집계로 구하므로
+    기간 전체 문서를 읽지 않습니다. (period, score 내림차순) 복합 인덱스가 필요합니다.
+    캐시는 잠금 안에서만 바꾸고, 다시 읽는 동안 점수가 기록되면 읽은 결과를 캐시하지 않습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boards: Dict[str, Board] = {}
+        # 기간별 점수 기록 횟수 (다시 읽는 동안의 기록 여부 확인용)
+        self._generations: Dict[str, int] = {}
+
+    def _load(self, key: str) -> Board:
+        """기간의 상위 TOP_CACHE_SIZE명과 전체 인원 수 조회 (잠금 없이 실행)"""
+        db = get_firestore_client()
+        if not db:
+            return Board()
+        entries = db.collection(ENTRY_COLLECTION).where('period', '==', key)
+        query = (
+            entries.order_by('score', direction=firestore.Query.DESCENDING)
+            .limit(TOP_CACHE_SIZE)
+            .select(['session_id', 'score'])
+        )
+        scores = {}
+        for doc in query.stream():
+            data = doc.to_dict()
+            scores[data['session_id']] = data.get('score', 0)
+        return Board(scores, _count(entries))
+
+    def _board(self, key: str) -> Board:
+        with self._lock:
+            board = self._boards.get(key)
+            if board is not None and time.monotonic() - board.loaded_at < CACHE_SECONDS:
+                return board
+            generation = self._generations.get(key, 0)
+        # 다른 워커의 기록을 반영하기 위해 주기적으로 다시 읽음 (Firestore 조회는 잠금 밖에서)
+        board = self._load(key)
+        with self._lock:
+            # 읽는 동안 기록된 점수가 결과에 들어갔는지 알 수 없으므로 그때는 캐시하지 않음
+            if self._generations.get(key, 0) == generation:
+                self._boards[key] = board
+        return board
+
+    def stage_score(self, batch, session_id: str, score: float, day: str):
+        """기간별 점수 문서에 Increment 쓰기를 호출한 쪽의 배치에 추가 (커밋 후 apply_score 호출)"""
+        if not score:
+            return
+        db = get_firestore_client()
+        if not db:
+            return
+        now = datetime.now().isoformat()
+        for key in period_keys(day).values():
+            batch.set(db.collection(ENTRY_COLLECTION).document(entry_doc_id(key, session_id)), {
+                'period': key,
+                'session_id': session_id,
+                'score': firestore.Increment(score),
+                'updated_at': now
+            }, merge=True)
+
+    def apply_score(self, session_id: str, score: float, day: str):
+        """커밋된 점수를 캐시에 반영 (캐시에 없는 사용자면 해당 기간 캐시를 버림)"""
+        if not score:
+            return
+        with self._lock:
+            for key in period_keys(day).values():
+                self._generations[key] = self._generations.get(key, 0) + 1
+                board = self._boards.get(key)
+                if board is None:
+                    continue
+                if session_id in board.scores:
+                    board.add_score(session_id, score)
+                else:
+                    del self._boards[key]
+
+    def top(self, period: str, day: str, limit: int) -> List[dict]:
+        board = self._board(period_keys(day)[period])
+        with self._lock:
+            return board.top(limit)
+
+    def position(self, period: str, day: str, session_id: str) -> Optional[dict]:
+        key = period_keys(day)[period]
+        with self._lock:
+            board = self._boards.get(key)
+            if board is not None and time.monotonic() - board.loaded_at < CACHE_SECONDS:
+                position = board.position(session_id)
+                if position is not None:
+                    return position
+        
+        # 상위 캐시 밖의 사용자는 점수 문서 1건 + count() 집계 2번으로 계산
+        db = get_firestore_client()
+        if not db:
+            return None
+        doc = db.collection(ENTRY_COLLECTION).document(entry_doc_id(key, session_id)).get()
+        if not doc.exists:
+            return None
+        score = doc.to_dict().get('score', 0)
+        entries = db.collection(ENTRY_COLLECTION).where('period', '==', key)
+        return {
+            'rank': _count(entries.where('score', '>', score)) + 1,
+            'session_id': session_id,
+            'score': score,
+            'total': _count(entries)
+        }
+
+# 프로세스 전역 리더보드
+leaderboard = LeaderboardManager()
@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, List, Union
+
+# Firestore 정수는 부호 있는 64비트이므로 날짜별 비트마스크를 63비트 단어 배열로 저장
+WORD_BITS = 63
+WORD_MASK = (1 << WORD_BITS) - 1
+# 날짜별 항목 번호 상한 (잘못된 큰 번호로 문서가 커지는 것 방지)
+MAX_ITEMS_PER_DATE = 4096
+
+def _to_words(bits: int) -> List[int]:
+    words = []
+    while bits:
+        words.append(bits & WORD_MASK)
+        bits >>= WORD_BITS
+    return words
+
+def _from_words(value: Union[int, List[int]]) -> int:
+    # 이전 형식(단일 정수)도 그대로 읽음
+    if isinstance(value, (list, tuple)):
+        return sum(int(word) << (WORD_BITS * position) for position, word in enumerate(value))
+    return int(value)
+
+class LearnedSet:
+    """학습한 항목 집합 (날짜를 컨테이너 키로 쓰는 로어링 방식 비트셋)
+
+    (날짜, 항목 번호)를 날짜별 임의 길이 정수 비트마스크 한 칸에 담아
+    합집합/교집합/차집합/개수를 컨테이너 단위 정수 연산으로 처리합니다.
+    저장할 때는 날짜별로 63비트 단어 배열로 나눕니다.
+    """
+
+    __slots__ = ('containers',)
+
+    def __init__(self, containers: Dict[str, int] = None):
+        self.containers = {date: bits for date, bits in (containers or {}).items() if bits}
+
+    @classmethod
+    def from_indices(cls, date: str, indices: Iterable[int]) -> 'LearnedSet':
+        """항목 번호 목록으로 생성 (범위를 벗어난 번호는 ValueError)"""
+        bits = 0
+        for index in indices:
+            if not 0 <= index < MAX_ITEMS_PER_DATE:
+                raise ValueError(f"Item index out of range: {index}")
+            bits |= 1 << index
+        return cls({date: bits})
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Union[int, List[int]]]) -> 'LearnedSet':
+        return cls({date: _from_words(value) for date, value in (data or {}).items()})
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return {date: _to_words(bits) for date, bits in self.containers.items()}
+
+    def __or__(self, other: 'LearnedSet') -> 'LearnedSet':
+        merged = dict(self.containers)
+        for date, bits in other.containers.items():
+            merged[date] = merged.get(date, 0) | bits
+        return LearnedSet(merged)
+
+    def __and__(self, other: 'LearnedSet') -> 'LearnedSet':
+        return LearnedSet({
+            date: bits & other.containers[date]
+            for date, bits in self.containers.items()
+            if date in other.containers
+        })
+
+    def __sub__(self, other: 'LearnedSet') -> 'LearnedSet':
+        return LearnedSet({
+            date: bits & ~other.containers.get(date, 0)
+            for date, bits in self.containers.items()
+        })
+
+    def __len__(self) -> int:
+        return sum(bits.bit_count() for bits in self.containers.values())
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, LearnedSet) and self.containers == other.containers
+
+    def indices(self) -> Dict[str, List[int]]:
+        """날짜별 항목 번호 목록 (응답용)"""
+        result = {}
+        for date in sorted(self.containers):
+            bits = self.containers[date]
+            result[date] = [index for index in range(bits.bit_length()) if bits >> index & 1]
+        return result
+
+def catalogue_set(item_counts: Dict[str, int]) -> LearnedSet:
+    """날짜별 항목 수로 전체 컨텐츠 집합 생성"""
+    return LearnedSet({
+        date: (1 << min(count, MAX_ITEMS_PER_DATE)) - 1
+        for date, count in item_counts.items()
+    })
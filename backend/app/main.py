@@ -1,10 +1,16 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 import os
 
-from .api import ai_info, quiz, prompt, base_content, term, auth, logs, system
+from .api import ai_info, quiz, prompt, base_content, term, auth, logs, system, review, user_progress, leaderboard
 from .firebase_db import initialize_firebase
+from .term_index import term_index
+from .term_linker import term_linker
+from .recommender import related_index
+from .replicas import replicas
+from .threadpool import threadpool_monitor
 
 app = FastAPI()
 
@@ -23,11 +29,22 @@ app.add_middleware(
 async def startup_event():
     """애플리케이션 시작 시 Firebase 초기화"""
     print("🚀 애플리케이션 시작 - Firebase 초기화 중...")
-    if initialize_firebase():
+    threadpool_monitor.start()
+    if await run_in_threadpool(initialize_firebase):
         print("✅ Firebase 초기화 완료")
+        await run_in_threadpool(term_index.load)
+        await run_in_threadpool(term_linker.rebuild, term_index.terms())
+        related_index.start_periodic_rebuild()
+        await run_in_threadpool(replicas.start_all)
     else:
         print("❌ Firebase 초기화 실패")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """종료 전에 대기 중인 진행상황 쓰기를 모두 기록"""
+    user_progress.progress_writes.flush_all()
+    replicas.stop_all()
+
 # 헬스체크 엔드포인트
 @app.get("/")
 async def root():
@@ -36,9 +53,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     try:
-        from .firebase_db import test_connection
+        from .firebase_db import async_test_connection
         # Firebase 연결 테스트
-        if test_connection():
+        if await async_test_connection():
             return {"status": "healthy", "database": "firebase_connected", "timestamp": "2024-01-01T00:00:00Z"}
         else:
             return {"status": "unhealthy", "database": "firebase_disconnected", "error": "Firebase connection failed", "timestamp": "2024-01-01T00:00:00Z"}
@@ -69,8 +86,11 @@ async def not_found_handler(request: Request, exc: HTTPException):
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(logs.router, prefix="/api/logs", tags=["Activity Logs"])
 app.include_router(system.router, prefix="/api/system", tags=["System Management"])
+app.include_router(user_progress.router, prefix="/api/user-progress", tags=["User Progress"])
 app.include_router(ai_info.router, prefix="/api/ai-info")
 app.include_router(quiz.router, prefix="/api/quiz")
 app.include_router(prompt.router, prefix="/api/prompt")
 app.include_router(base_content.router, prefix="/api/base-content")
-app.include_router(term.router, prefix="/api/term") 
\ No newline at end of file
+app.include_router(term.router, prefix="/api/term")
+app.include_router(review.router, prefix="/api/review", tags=["Review"])
+app.include_router(leaderboard.router, prefix="/api/leaderboard", tags=["Leaderboard"]) 
\ No newline at end of file
@@ -0,0 +1,86 @@
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError, create_model
+
+# Firestore 문서 필드가 아니라 서버에서 채우는 응답 필드 (select()에서 제외)
+COMPUTED_FIELDS = frozenset({'id', 'version', 'related', 'term_count'})
+
+Fields = Optional[Tuple[str, ...]]
+
+def field_selector(model: Type[BaseModel]) -> Callable[..., Fields]:
+    """?fields=a,b,c 파라미터를 응답 모델 필드 튜플로 변환하는 의존성 (없으면 None = 전체 필드)
+
+    모르는 필드는 400으로 거절하고, 요청 순서와 관계없이 모델 필드 순서로 정렬합니다.
+    """
+    names = tuple(model.model_fields)
+
+    def dependency(fields: Optional[str] = Query(None, description=f"반환할 필드 (쉼표 구분): {', '.join(names)}")) -> Fields:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = requested - set(names)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        if not requested:
+            raise HTTPException(status_code=400, detail="fields must not be empty")
+        return tuple(name for name in names if name in requested)
+
+    return dependency
+
+def wants(fields: Fields, name: str) -> bool:
+    """응답에 해당 필드가 포함되는지 (계산 비용이 큰 필드를 건너뛸 때 사용)"""
+    return fields is None or name in fields
+
+def select_fields(fields: Fields, extra: Iterable[str] = ()) -> Optional[List[str]]:
+    """Firestore select()에 넘길 문서 필드 목록 (None이면 전체 문서 조회)
+
+    extra에는 응답에는 없지만 서버 쪽 계산에 필요한 필드를 넘깁니다.
+    """
+    if fields is None:
+        return None
+    return [name for name in fields if name not in COMPUTED_FIELDS] + [name for name in extra if name not in fields]
+
+@lru_cache(maxsize=256)
+def projected_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """요청된 필드만 가진 응답 모델 (필드 조합별로 한 번만 생성)"""
+    definitions = {}
+    for name in fields:
+        info = model.model_fields[name]
+        definitions[name] = (info.annotation, ... if info.is_required() else info.default)
+    return create_model(f"{model.__name__}[{','.join(fields)}]", **definitions)
+
+def project(rows, model: Type[BaseModel], fields: Fields):
+    """fields가 있으면 해당 필드만 검증/직렬화한 JSONResponse, 없으면 rows 그대로 (라우트의 response_model 사용)
+
+    검증에 실패하면 빈 목록 대신 500 HTTPException을 냅니다 (호출한 쪽은 HTTPException을 다시 raise).
+    """
+    if fields is None:
+        return rows
+    projected = projected_model(model, fields)
+    try:
+        if isinstance(rows, list):
+            content = [projected.model_validate(row).model_dump(mode='json') for row in rows]
+        else:
+            content = projected.model_validate(rows).model_dump(mode='json')
+    except ValidationError as e:
+        print(f"❌ 응답 필드 검증 실패 ({model.__name__}): {e}")
+        raise HTTPException(status_code=500, detail=f"Response validation failed for {model.__name__}")
+    return JSONResponse(content=content)
+
+def stream_project(rows: Iterable[dict], model: Type[BaseModel], fields: Fields) -> StreamingResponse:
+    """rows를 하나씩 검증/직렬화해 JSON 배열로 스트리밍 (fields가 있으면 해당 필드만)
+
+    전체 목록을 메모리에 모으지 않습니다. 응답을 보내기 시작한 뒤 조회가 실패하면 배열이 닫히지 않은 채 끝납니다.
+    """
+    row_model = model if fields is None else projected_model(model, fields)
+
+    def chunks() -> Iterator[str]:
+        yield '['
+        for position, row in enumerate(rows):
+            yield (',' if position else '') + row_model.model_validate(row).model_dump_json()
+        yield ']'
+
+    return StreamingResponse(chunks(), media_type='application/json')
@@ -0,0 +1,95 @@
+import random
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from .cache import TieredCache
+from .firebase_db import get_collection
+from .term_index import normalize_term, term_index
+from .text_vectors import tfidf_matrix
+
+OPTION_COUNT = 4
+QUESTION_TEMPLATE = "다음 설명에 해당하는 용어는 무엇인가요?\n\n{description}"
+
+# 날짜별 문제 풀 캐시 (키: 날짜)
+_pool_cache = TieredCache('quiz_pool', maxsize=512, ttl=3600)
+
+def _candidate_terms(date_terms: List[dict]) -> List[dict]:
+    """오답 후보: 용어 사전 전체 + 해당 날짜의 용어 (이름 기준 중복 제거)"""
+    candidates = {}
+    for term in term_index.terms() + date_terms:
+        name = (term.get('term') or '').strip()
+        key = normalize_term(name)
+        if key and key not in candidates:
+            candidates[key] = {'term': name, 'description': term.get('description') or ''}
+    return list(candidates.values())
+
+def build_questions(date_terms: List[dict], rng: Optional[random.Random] = None) -> List[dict]:
+    """날짜의 용어마다 TF-IDF 유사도가 높은 용어를 오답으로 쓰는 객관식 문제 생성"""
+    rng = rng or random.Random()
+    date_terms = [term for term in date_terms if term.get('term') and term.get('description')]
+    candidates = _candidate_terms(date_terms)
+    if not date_terms or len(candidates) < OPTION_COUNT:
+        return []
+
+    index_by_key = {normalize_term(term['term']): i for i, term in enumerate(candidates)}
+    matrix, _ = tfidf_matrix([f"{term['term']} {term['description']}" for term in candidates])
+
+    answer_rows = [index_by_key[normalize_term(term['term'])] for term in date_terms]
+    # 정답 용어 전체와 후보 전체의 코사인 유사도를 한 번의 행렬곱으로 계산
+    similarity = (matrix[answer_rows] @ matrix.T).toarray()
+
+    questions = []
+    for term, row, scores in zip(date_terms, answer_rows, similarity):
+        scores[row] = -np.inf
+        ranked = np.argsort(-scores)[:OPTION_COUNT - 1]
+        distractors = [candidates[i]['term'] for i in ranked]
+        options = distractors + [term['term']]
+        rng.shuffle(options)
+        correct = options.index(term['term'])
+        questions.append({
+            'question': QUESTION_TEMPLATE.format(description=term['description']),
+            **{f'option{i + 1}': option for i, option in enumerate(options)},
+            'correct': correct,
+            'explanation': f"{term['term']}: {term['description']}"
+        })
+    return questions
+
+def build_quiz_pool(date: str, items: List[dict]) -> int:
+    """AI 정보 저장 후 백그라운드에서 날짜별 문제 풀을 미리 생성해 저장"""
+    try:
+        term_index.ensure_loaded()
+        date_terms = [term for item in items for term in item.get('terms') or []]
+        questions = build_questions(date_terms)
+
+        pool_collection = get_collection('quiz_pool')
+        if pool_collection:
+            pool_collection.document(date).set({
+                'date': date,
+                'questions': questions,
+                'created_at': datetime.now().isoformat()
+            })
+        _pool_cache.set(date, questions)
+        print(f"✅ 퀴즈 풀 생성 완료: {date} ({len(questions)}문제)")
+        return len(questions)
+    except Exception as e:
+        print(f"❌ 퀴즈 풀 생성 실패 ({date}): {e}")
+        return 0
+
+def get_quiz_pool(date: str) -> List[dict]:
+    """미리 생성된 문제 풀 조회 (메모리 캐시 → quiz_pool 문서)"""
+    questions = _pool_cache.get(date)
+    if questions is not None:
+        return questions
+
+    pool_collection = get_collection('quiz_pool')
+    if not pool_collection:
+        return []
+    doc = pool_collection.document(date).get()
+    questions = doc.to_dict().get('questions', []) if doc.exists else []
+    _pool_cache.set(date, questions)
+    return questions
+
+def invalidate_quiz_pool(date: str):
+    _pool_cache.delete(date)
@@ -0,0 +1,61 @@
+import math
+from typing import Any, Dict, Optional
+from firebase_admin import firestore
+
+def build_stats_update(choice: int, is_correct: bool, rest_score: Optional[float]) -> Dict[str, Any]:
+    """채점된 답안 1건을 문항 통계 누적값 갱신으로 변환
+
+    rest_score는 같은 응시에서 이 문항을 제외한 정답률이며, 점이연 상관계수 계산에 쓰입니다.
+    누적값은 모두 합계라서 Increment로 여러 워커가 동시에 갱신해도 정확합니다.
+    """
+    update = {
+        'attempts': firestore.Increment(1),
+        'correct': firestore.Increment(int(is_correct)),
+        'choices': {str(choice): firestore.Increment(1)}
+    }
+    if rest_score is not None:
+        update.update({
+            'scored_attempts': firestore.Increment(1),
+            'scored_correct': firestore.Increment(int(is_correct)),
+            'sum_rest': firestore.Increment(rest_score),
+            'sum_rest_sq': firestore.Increment(rest_score * rest_score),
+            'sum_rest_correct': firestore.Increment(rest_score if is_correct else 0.0)
+        })
+    return update
+
+def point_biserial(n: int, n_correct: int, sum_x: float, sum_x_sq: float, sum_x_correct: float) -> Optional[float]:
+    """누적 합계로 점이연 상관계수(문항 변별도) 계산"""
+    n_wrong = n - n_correct
+    if n < 2 or n_correct == 0 or n_wrong == 0:
+        return None
+    mean = sum_x / n
+    variance = max(sum_x_sq / n - mean * mean, 0.0)
+    if variance == 0:
+        return None
+    mean_correct = sum_x_correct / n_correct
+    mean_wrong = (sum_x - sum_x_correct) / n_wrong
+    p = n_correct / n
+    return (mean_correct - mean_wrong) / math.sqrt(variance) * math.sqrt(p * (1 - p))
+
+def item_statistics(quiz_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """문항 통계 문서에서 정답률, 선택지 분포, 변별도 계산"""
+    attempts = data.get('attempts', 0)
+    correct = data.get('correct', 0)
+    choices = data.get('choices') or {}
+    discrimination = point_biserial(
+        data.get('scored_attempts', 0),
+        data.get('scored_correct', 0),
+        data.get('sum_rest', 0.0),
+        data.get('sum_rest_sq', 0.0),
+        data.get('sum_rest_correct', 0.0)
+    )
+    return {
+        'quiz_id': quiz_id,
+        'topic': data.get('topic'),
+        'attempts': attempts,
+        'correct_rate': round(correct / attempts, 4) if attempts else None,
+        'choice_distribution': {
+            choice: round(count / attempts, 4) for choice, count in sorted(choices.items())
+        } if attempts else {},
+        'discrimination': round(discrimination, 4) if discrimination is not None else None
+    }
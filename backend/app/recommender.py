@@ -0,0 +1,287 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from .firebase_db import get_firestore_client
+from .firebase_models import AI_INFO_ITEMS, FirebaseAIInfo, FirebaseAIInfoItem
+from .text_vectors import tfidf_matrix, top_k_rows
+
+TOP_K = int(os.getenv('RELATED_TOP_K', '5'))
+REBUILD_INTERVAL_SECONDS = int(os.getenv('RELATED_REBUILD_INTERVAL', str(6 * 3600)))
+REBUILD_BLOCK_ROWS = 512
+# 증분 추가 행을 기본 행렬에 합치는 기준 행 수
+APPEND_FOLD_ROWS = 256
+
+def ai_info_date_prefix(date: str) -> str:
+    return f"ai_info:{date}:"
+
+def ai_info_key(date: str, index: int) -> str:
+    return f"{ai_info_date_prefix(date)}{index}"
+
+def content_key(kind: str, doc_id: str) -> str:
+    return f"{kind}:{doc_id}"
+
+class RelatedContentIndex:
+    """AI 정보·프롬프트·기본 컨텐츠 간 유사 항목 인덱스 (항목별 상위 k개 미리 계산)
+
+    행렬 계산은 쓰기 잠금(_write_lock)에서만 하고, 조회용 잠금(_lock)은
+    이웃/메타 사전을 바꿔 끼울 때만 잡으므로 related()는 쓰기 중에도 막히지 않습니다.
+    전체 재구성 중(및 첫 구성 전)의 추가/삭제는 대기열에 모았다가 새 인덱스에 다시 적용합니다.
+    """
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._dead: set = set()
+        self._meta: Dict[str, dict] = {}
+        self._base: Optional[sparse.csr_matrix] = None
+        self._appended: List[sparse.csr_matrix] = []
+        self._idf: Optional[np.ndarray] = None
+        self._neighbors: Dict[str, List[tuple]] = {}
+        # 재구성 중 들어온 변경 (None이면 재구성 중이 아님, 첫 구성 전에는 빈 목록)
+        self._pending: Optional[List[tuple]] = []
+        self._loaded = False
+        self._rebuild_thread: Optional[threading.Thread] = None
+
+    def _build(self, documents: List[dict]) -> dict:
+        """TF-IDF 행렬을 만들고 블록 단위 희소 행렬곱으로 상위 k개 계산 (잠금 없이 실행)"""
+        matrix, idf = tfidf_matrix([doc['text'] for doc in documents])
+
+        neighbors = []
+        for start in range(0, matrix.shape[0], REBUILD_BLOCK_ROWS):
+            block = matrix[start:start + REBUILD_BLOCK_ROWS] @ matrix.T
+            for offset, row_neighbors in enumerate(top_k_rows(block, self.k + 1, exclude_diagonal=False)):
+                row = start + offset
+                neighbors.append([(col, score) for col, score in row_neighbors if col != row][:self.k])
+
+        keys = [doc['key'] for doc in documents]
+        return {
+            'keys': keys,
+            'meta': {doc['key']: doc['meta'] for doc in documents},
+            'matrix': matrix,
+            'idf': idf,
+            'neighbors': {
+                keys[row]: [(keys[col], score) for col, score in row_neighbors]
+                for row, row_neighbors in enumerate(neighbors)
+            }
+        }
+
+    def _swap(self, built: dict):
+        """쓰기 잠금 안에서 호출: 새로 구성한 인덱스로 교체"""
+        self._keys = built['keys']
+        self._rows = {key: row for row, key in enumerate(built['keys'])}
+        self._dead = set()
+        self._base = built['matrix']
+        self._appended = []
+        self._idf = built['idf']
+        with self._lock:
+            self._meta = built['meta']
+            self._neighbors = built['neighbors']
+
+    def _begin_rebuild(self):
+        """지금부터 들어오는 변경을 재구성 후 다시 적용하도록 기록 시작"""
+        with self._write_lock:
+            if self._pending is None:
+                self._pending = []
+
+    def _abort_rebuild(self):
+        with self._write_lock:
+            if self._loaded:
+                self._pending = None
+
+    def rebuild(self, documents: List[dict]):
+        """전체 재구성 (계산은 잠금 밖에서, 교체 후 그동안의 변경을 다시 적용)"""
+        started = time.monotonic()
+        self._begin_rebuild()
+        documents = [doc for doc in documents if doc.get('text')]
+        built = self._build(documents) if documents else None
+
+        with self._write_lock:
+            if built is not None:
+                self._swap(built)
+            pending, self._pending = self._pending or [], None
+            self._loaded = True
+            for operation, *args in pending:
+                getattr(self, f'_apply_{operation}')(*args)
+        print(f"✅ 관련 컨텐츠 인덱스 재구성: {len(documents)}개, 대기 변경 {len(pending)}건 "
+              f"({time.monotonic() - started:.2f}s)")
+
+    def _scores(self, vector: sparse.csr_matrix) -> np.ndarray:
+        """모든 행과의 유사도 (삭제/교체된 행은 0)"""
+        parts = [(self._base @ vector.T).toarray().ravel()]
+        if self._appended:
+            parts.append((sparse.vstack(self._appended, format='csr') @ vector.T).toarray().ravel())
+        scores = np.concatenate(parts)
+        if self._dead:
+            scores[list(self._dead)] = 0.0
+        return scores
+
+    def _append(self, vector: sparse.csr_matrix):
+        self._appended.append(vector)
+        # 추가 행이 쌓이면 기본 행렬에 합침 (추가 행 행렬곱 비용을 일정하게 유지)
+        if len(self._appended) >= APPEND_FOLD_ROWS:
+            self._base = sparse.vstack([self._base, *self._appended], format='csr')
+            self._appended = []
+
+    def _without(self, key: str) -> Dict[str, List[tuple]]:
+        """다른 항목의 이웃 목록에서 key를 뺀 새 목록들"""
+        return {
+            other_key: [pair for pair in current if pair[0] != key]
+            for other_key, current in self._neighbors.items()
+            if any(neighbor == key for neighbor, _ in current)
+        }
+
+    def upsert(self, key: str, meta: dict, text: str):
+        """항목 1건 추가/수정 후 해당 항목과 영향받는 이웃 목록만 갱신"""
+        if not text:
+            return
+        with self._write_lock:
+            if self._pending is not None:
+                self._pending.append(('upsert', key, meta, text))
+                if not self._loaded:
+                    # 첫 구성이 끝나면 적용
+                    return
+            self._apply_upsert(key, meta, text)
+
+    def _apply_upsert(self, key: str, meta: dict, text: str):
+        if self._idf is None:
+            # 빈 인덱스였으면 이 항목만으로 시작
+            self._swap(self._build([{'key': key, 'meta': meta, 'text': text}]))
+            return
+        vector, _ = tfidf_matrix([text], idf=self._idf)
+        if key in self._rows:
+            self._dead.add(self._rows[key])
+        row = len(self._keys)
+        self._keys.append(key)
+        self._rows[key] = row
+        self._append(vector)
+
+        scores = self._scores(vector)
+        scores[row] = 0.0
+        top = np.argsort(-scores)[:self.k]
+        updates = self._without(key)
+        updates[key] = [(self._keys[i], float(scores[i])) for i in top if scores[i] > 0]
+
+        # 새 항목이 기존 항목의 상위 k개에 들어가는 경우만 갱신
+        for other_row in np.nonzero(scores > 0)[0]:
+            other_key = self._keys[other_row]
+            if other_key not in self._meta or other_key == key:
+                continue
+            current = updates.get(other_key, self._neighbors.get(other_key, []))
+            score = float(scores[other_row])
+            if len(current) < self.k or score > current[-1][1]:
+                current = sorted(current + [(key, score)], key=lambda pair: -pair[1])[:self.k]
+                updates[other_key] = current
+
+        with self._lock:
+            self._meta[key] = meta
+            self._neighbors.update(updates)
+
+    def remove(self, key: str):
+        with self._write_lock:
+            if self._pending is not None:
+                self._pending.append(('remove', key))
+                if not self._loaded:
+                    return
+            self._apply_remove(key)
+
+    def _apply_remove(self, key: str):
+        if key not in self._meta:
+            return
+        self._dead.add(self._rows.pop(key))
+        updates = self._without(key)
+        with self._lock:
+            self._neighbors.update(updates)
+            self._neighbors.pop(key, None)
+            self._meta.pop(key, None)
+
+    def remove_prefix(self, prefix: str):
+        """키 접두어로 여러 항목 제거 (예: 특정 날짜의 AI 정보 전체)"""
+        with self._write_lock:
+            if self._pending is not None:
+                self._pending.append(('remove_prefix', prefix))
+                if not self._loaded:
+                    return
+            self._apply_remove_prefix(prefix)
+
+    def _apply_remove_prefix(self, prefix: str):
+        for key in [key for key in self._meta if key.startswith(prefix)]:
+            self._apply_remove(key)
+
+    def related(self, key: str) -> List[dict]:
+        """미리 계산된 관련 항목 (Firestore 조회 없음)"""
+        with self._lock:
+            return [
+                {**self._meta[neighbor], 'score': round(score, 4)}
+                for neighbor, score in self._neighbors.get(key, [])
+                if neighbor in self._meta
+            ]
+
+    def load(self) -> bool:
+        """Firestore의 전체 컨텐츠로 인덱스 재구성"""
+        try:
+            db = get_firestore_client()
+            if not db:
+                return False
+            # 읽기 시작 이후의 변경은 재구성 결과에 다시 적용
+            self._begin_rebuild()
+            documents = []
+
+            inline_dates = set()
+            for doc in db.collection('ai_info').stream():
+                ai_info = FirebaseAIInfo.from_dict(doc.to_dict())
+                if ai_info.has_inline_items:
+                    inline_dates.add(ai_info.date)
+                    documents.extend(ai_info_document(item) for item in ai_info.items)
+            for doc in db.collection_group(AI_INFO_ITEMS).stream():
+                item = FirebaseAIInfoItem.from_dict(doc.to_dict())
+                if item.date not in inline_dates:
+                    documents.append(ai_info_document(item))
+
+            for kind in ('prompt', 'base_content'):
+                for doc in db.collection(kind).stream():
+                    documents.append(content_document(kind, doc.id, doc.to_dict()))
+
+            self.rebuild(documents)
+            return True
+        except Exception as e:
+            self._abort_rebuild()
+            print(f"❌ 관련 컨텐츠 인덱스 구성 실패: {e}")
+            return False
+
+    def start_periodic_rebuild(self, interval: int = REBUILD_INTERVAL_SECONDS):
+        """백그라운드 스레드에서 즉시 1회, 이후 주기적으로 전체 재구성"""
+        if self._rebuild_thread and self._rebuild_thread.is_alive():
+            return
+
+        def run():
+            while True:
+                self.load()
+                time.sleep(interval)
+
+        self._rebuild_thread = threading.Thread(target=run, name='related-content-rebuild', daemon=True)
+        self._rebuild_thread.start()
+
+def ai_info_document(item: FirebaseAIInfoItem) -> dict:
+    return {
+        'key': ai_info_key(item.date, item.index),
+        'meta': {'kind': 'ai_info', 'id': item.date, 'index': item.index, 'title': item.title},
+        'text': f"{item.title} {item.content}"
+    }
+
+def content_document(kind: str, doc_id: str, data: dict) -> dict:
+    return {
+        'key': content_key(kind, doc_id),
+        'meta': {'kind': kind, 'id': doc_id, 'title': data.get('title', '')},
+        'text': f"{data.get('title', '')} {data.get('category', '')} {data.get('content', '')}"
+    }
+
+# 프로세스 전역 관련 컨텐츠 인덱스
+related_index = RelatedContentIndex()
@@ -0,0 +1,258 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .firebase_db import get_collection, document_version
+
+# 리스너 상태 점검 주기와 스냅샷이 오래 없을 때 경고하는 기준 (초)
+REPLICA_CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', '30'))
+REPLICA_STALE_ALERT_SECONDS = float(os.getenv('REPLICA_STALE_ALERT_SECONDS', '3600'))
+
+class CollectionReplica:
+    """on_snapshot 리스너로 유지되는 작은 컬렉션의 메모리 복제본 (필드별 색인 포함)
+
+    첫 스냅샷을 받기 전(ready=False)에는 호출한 쪽이 Firestore를 직접 조회해야 합니다.
+    리스너가 끊기면 ready를 내리고 check()에서 다시 연결합니다.
+    """
+
+    def __init__(self, name: str, index_fields: Iterable[str] = ()):
+        self.name = name
+        self.index_fields = tuple(index_fields)
+        self._lock = threading.Lock()
+        self._docs: Dict[str, dict] = {}
+        self._indexes: Dict[str, Dict[str, Set[str]]] = {field: {} for field in self.index_fields}
+        self._watch = None
+        # start() 이후 stop() 전까지 True (첫 연결이 실패해 _watch가 없어도 check()가 재시도)
+        self._active = False
+        self._ready = threading.Event()
+        self.snapshots = 0
+        self.changes = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_snapshot_at: Optional[float] = None
+        self.restarts = 0
+        self.failures = 0
+        self.stale_alerts = 0
+        self._alerted_snapshot: Optional[float] = None
+        self._failed = False
+        self._listeners: List[Callable[['CollectionReplica', list], None]] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def _unindex(self, doc_id: str):
+        previous = self._docs.get(doc_id)
+        if previous is None:
+            return
+        for field in self.index_fields:
+            ids = self._indexes[field].get(previous.get(field))
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self._indexes[field][previous.get(field)]
+
+    def upsert(self, doc_id: str, data: dict):
+        """문서 반영 (리스너 외에 이 워커의 쓰기 직후에도 호출해 즉시 읽기 일관성 보장)"""
+        with self._lock:
+            self._unindex(doc_id)
+            self._docs[doc_id] = dict(data)
+            for field in self.index_fields:
+                self._indexes[field].setdefault(data.get(field), set()).add(doc_id)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._unindex(doc_id)
+            self._docs.pop(doc_id, None)
+
+    def add_listener(self, callback: Callable[['CollectionReplica', list], None]):
+        """스냅샷 반영 후 호출할 함수 등록 (다른 워커의 변경을 파생 인덱스에 반영할 때 사용)"""
+        self._listeners.append(callback)
+
+    def _on_snapshot(self, col_snapshot, changes, read_time):
+        if self._failed:
+            # 재연결 전까지 이후 스냅샷은 무시 (일부만 반영된 상태로 ready가 되지 않도록)
+            return
+        try:
+            self._apply_snapshot(changes, read_time)
+        except Exception as e:
+            # 반영에 실패한 복제본은 더 이상 믿을 수 없으므로 읽기를 Firestore로 돌리고 재연결 대기
+            self._failed = True
+            self._ready.clear()
+            self.failures += 1
+            print(f"❌ {self.name} 복제본 스냅샷 반영 실패: {e}")
+            return
+        for callback in self._listeners:
+            try:
+                callback(self, changes)
+            except Exception as e:
+                print(f"❌ {self.name} 복제본 후처리 실패: {e}")
+
+    def _apply_snapshot(self, changes, read_time):
+        for change in changes:
+            if change.type.name == 'REMOVED':
+                self.remove(change.document.id)
+            else:
+                self.upsert(change.document.id, {
+                    **change.document.to_dict(),
+                    'version': document_version(change.document.update_time)
+                })
+        # read_time은 서버 기준 스냅샷 시각이므로 적용 완료 시점과의 차이가 복제 지연
+        lag = max((datetime.now(timezone.utc) - read_time).total_seconds(), 0.0) if read_time else 0.0
+        with self._lock:
+            self.snapshots += 1
+            self.changes += len(changes)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self.last_snapshot_at = time.time()
+        if not self._ready.is_set():
+            self._ready.set()
+            print(f"✅ {self.name} 복제본 준비 완료: {len(self._docs)}개")
+
+    def start(self):
+        self._active = True
+        if self._watch is not None:
+            return
+        collection = get_collection(self.name)
+        if collection:
+            self._watch = collection.on_snapshot(self._on_snapshot)
+
+    def stop(self):
+        self._active = False
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+            self._ready.clear()
+
+    @property
+    def healthy(self) -> bool:
+        # Watch는 복구할 수 없는 오류로 스트림이 끝나면 스스로 닫히지만 콜백을 주지 않음
+        return self._watch is not None and not self._failed and not getattr(self._watch, '_closed', False)
+
+    def _reset(self):
+        with self._lock:
+            self._docs = {}
+            self._indexes = {field: {} for field in self.index_fields}
+
+    def restart(self):
+        """리스너 재연결 (첫 스냅샷이 전체 문서를 다시 보내므로 기존 내용은 비움)"""
+        self._ready.clear()
+        watch, self._watch = self._watch, None
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                print(f"⚠️ {self.name} 복제본 리스너 해제 실패: {e}")
+        self._reset()
+        self._failed = False
+        self.restarts += 1
+        self.start()
+
+    def check(self):
+        """리스너가 끊겼으면 재연결하고, 스냅샷이 오래 없으면 경고"""
+        if not self._active:
+            return
+        if not self.healthy:
+            print(f"⚠️ {self.name} 복제본 리스너 없음 또는 중단, 재연결")
+            self.restart()
+            return
+        age = self.snapshot_age
+        # 같은 스냅샷에 대해서는 한 번만 경고
+        if age is not None and age > REPLICA_STALE_ALERT_SECONDS and self._alerted_snapshot != self.last_snapshot_at:
+            self._alerted_snapshot = self.last_snapshot_at
+            self.stale_alerts += 1
+            print(f"⚠️ {self.name} 복제본 스냅샷이 {age:.0f}초 동안 없음 (변경이 없는 것인지 확인 필요)")
+
+    @property
+    def snapshot_age(self) -> Optional[float]:
+        return time.time() - self.last_snapshot_at if self.last_snapshot_at else None
+
+    def _rows(self, ids: Iterable[str]) -> List[dict]:
+        return [{**self._docs[doc_id], 'id': doc_id} for doc_id in ids]
+
+    def all(self, order_by: Optional[str] = None, descending: bool = False) -> List[dict]:
+        with self._lock:
+            rows = self._rows(self._docs)
+        if order_by:
+            rows.sort(key=lambda row: row.get(order_by) or '', reverse=descending)
+        return rows
+
+    def get(self, doc_id: str) -> Optional[dict]:
+        with self._lock:
+            data = self._docs.get(doc_id)
+            return {**data, 'id': doc_id} if data is not None else None
+
+    def where(self, field: str, value) -> List[dict]:
+        """색인된 필드 값으로 조회"""
+        with self._lock:
+            return self._rows(self._indexes[field].get(value, ()))
+
+    def values(self, field: str) -> List:
+        """색인된 필드의 고유 값 목록"""
+        with self._lock:
+            return [value for value in self._indexes[field] if value]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "healthy": self.healthy,
+                "restarts": self.restarts,
+                "failures": self.failures,
+                "stale_alerts": self.stale_alerts,
+                "documents": len(self._docs),
+                "snapshots": self.snapshots,
+                "changes": self.changes,
+                "last_lag_seconds": round(self.last_lag, 3),
+                "max_lag_seconds": round(self.max_lag, 3),
+                "seconds_since_snapshot": round(time.time() - self.last_snapshot_at, 1) if self.last_snapshot_at else None
+            }
+
+class ReplicaManager:
+    """컬렉션별 복제본 묶음 (시작 시 리스너 연결)"""
+
+    def __init__(self, specs: Dict[str, Iterable[str]]):
+        self._replicas = {name: CollectionReplica(name, fields) for name, fields in specs.items()}
+        self._stop = threading.Event()
+        self._supervisor: Optional[threading.Thread] = None
+
+    def __getitem__(self, name: str) -> CollectionReplica:
+        return self._replicas[name]
+
+    def start_all(self):
+        for replica in self._replicas.values():
+            try:
+                replica.start()
+            except Exception as e:
+                print(f"❌ {replica.name} 복제본 리스너 연결 실패: {e}")
+        if self._supervisor is None or not self._supervisor.is_alive():
+            self._stop.clear()
+            self._supervisor = threading.Thread(target=self._supervise, name='replica-supervisor', daemon=True)
+            self._supervisor.start()
+
+    def _supervise(self):
+        """주기적으로 리스너 상태 점검 (끊긴 리스너 재연결)"""
+        while not self._stop.wait(REPLICA_CHECK_INTERVAL):
+            for replica in self._replicas.values():
+                try:
+                    replica.check()
+                except Exception as e:
+                    print(f"❌ {replica.name} 복제본 재연결 실패: {e}")
+
+    def stop_all(self):
+        self._stop.set()
+        for replica in self._replicas.values():
+            replica.stop()
+
+    def stats(self) -> dict:
+        return {name: replica.stats() for name, replica in self._replicas.items()}
+
+# 프로세스 전역 복제본 (컬렉션: 색인 필드)
+replicas = ReplicaManager({
+    'term': ['category'],
+    'prompt': ['category'],
+    'base_content': ['category'],
+    'quiz': ['topic']
+})
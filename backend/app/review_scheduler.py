@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+REVIEW_KINDS = ('term', 'quiz')
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+def review_doc_id(session_id: str, kind: str, item_id: str) -> str:
+    """사용자·항목별 복습 상태 문서 ID"""
+    return f"{session_id}__{kind}__{item_id}"
+
+def sm2(state: Optional[Dict[str, Any]], quality: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """SM-2 알고리즘으로 다음 복습 상태 계산
+
+    quality는 0(전혀 기억 못함)~5(완벽) 척도이며, 3 미만이면 반복 횟수를 초기화합니다.
+    """
+    now = now or datetime.now(timezone.utc)
+    state = state or {}
+    ease = state.get('ease', DEFAULT_EASE)
+    interval = state.get('interval', 0)
+    repetitions = state.get('repetitions', 0)
+
+    if quality < 3:
+        repetitions = 0
+        interval = 1
+    else:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+        repetitions += 1
+
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    return {
+        'ease': round(ease, 4),
+        'interval': interval,
+        'repetitions': repetitions,
+        'last_quality': quality,
+        'last_reviewed_at': now,
+        'due_at': now + timedelta(days=interval),
+        'lapses': state.get('lapses', 0) + (1 if quality < 3 else 0)
+    }
@@ -16,7 +16,7 @@ class UserLogin(BaseModel):
     password: str
 
 class UserResponse(UserBase):
-    id: int
+    id: str
     role: str
     created_at: Optional[datetime] = None
     
@@ -33,13 +33,35 @@ class TermItem(BaseModel):
     term: str
     description: str
 
+class TermLink(BaseModel):
+    term: str
+    term_id: Optional[str] = None
+    start: int
+    end: int
+
+class RelatedItem(BaseModel):
+    kind: str
+    id: str
+    index: Optional[int] = None
+    title: str
+    score: float
+
 class AIInfoItem(BaseModel):
+    index: Optional[int] = None
     title: str
     content: str
     terms: Optional[List[TermItem]] = []
+    links: Optional[List[TermLink]] = []
+    related: Optional[List[RelatedItem]] = []
+
+class AIInfoSummary(BaseModel):
+    index: int
+    title: str
+    term_count: int = 0
 
 class AIInfoCreate(BaseModel):
     date: str
+    items: Optional[List[AIInfoItem]] = None
     info1_title: Optional[str] = None
     info1_content: Optional[str] = None
     info1_terms: Optional[List[TermItem]] = None
@@ -50,8 +72,18 @@ class AIInfoCreate(BaseModel):
     info3_content: Optional[str] = None
     info3_terms: Optional[List[TermItem]] = None
 
+    def collect_items(self) -> List[AIInfoItem]:
+        """items와 기존 info1..info3 필드를 하나의 항목 목록으로 합침"""
+        items = [item for item in self.items or [] if item.title and item.content]
+        for n in (1, 2, 3):
+            title = getattr(self, f'info{n}_title')
+            content = getattr(self, f'info{n}_content')
+            if title and content:
+                items.append(AIInfoItem(title=title, content=content, terms=getattr(self, f'info{n}_terms') or []))
+        return items
+
 class AIInfoResponse(BaseModel):
-    id: int
+    id: str
     date: str
     infos: List[AIInfoItem]
     created_at: str
@@ -70,39 +102,73 @@ class QuizCreate(BaseModel):
     correct: int
     explanation: str
 
-class QuizResponse(BaseModel):
-    id: int
+class QuizPublicResponse(BaseModel):
+    id: str
     topic: str
     question: str
     option1: str
     option2: str
     option3: str
     option4: str
-    correct: int
-    explanation: str
-    created_at: datetime
+    created_at: Optional[datetime] = None
+    version: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class QuizResponse(QuizPublicResponse):
+    correct: int
+    explanation: str
+
+class QuizAnswer(BaseModel):
+    quiz_id: str
+    choice: int
+
+class QuizSubmission(BaseModel):
+    session_id: str
+    date: str
+    topic: Optional[str] = None
+    answers: List[QuizAnswer]
+
+class QuizGradeResult(BaseModel):
+    quiz_id: str
+    choice: int
+    correct: Optional[int] = None
+    is_correct: bool
+    explanation: Optional[str] = None
+
+class QuizSubmissionResponse(BaseModel):
+    attempt_id: str
+    score: int
+    total: int
+    results: List[QuizGradeResult]
+
 # User Progress Schemas
 class UserProgressCreate(BaseModel):
     session_id: str
     date: str
     learned_info: List[int]
     stats: Optional[dict] = None
+    quiz_score: Optional[int] = None
 
 class UserProgressResponse(BaseModel):
-    id: int
+    id: str
     session_id: str
     date: str
     learned_info: List[int]
     stats: Optional[dict]
+    quiz_score: Optional[int] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
+class UserProgressAccepted(BaseModel):
+    id: str
+    status: str
+    write_delay: float
+    pending: UserProgressCreate
+
 # Prompt Schemas
 class PromptCreate(BaseModel):
     title: str
@@ -110,11 +176,13 @@ class PromptCreate(BaseModel):
     category: str
 
 class PromptResponse(BaseModel):
-    id: int
+    id: str
     title: str
     content: str
     category: str
-    created_at: datetime
+    created_at: Optional[datetime] = None
+    related: Optional[List[RelatedItem]] = []
+    version: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -126,11 +194,12 @@ class BaseContentCreate(BaseModel):
     category: str
 
 class BaseContentResponse(BaseModel):
-    id: int
+    id: str
     title: str
     content: str
     category: str
     created_at: str
+    related: Optional[List[RelatedItem]] = []
 
     class Config:
         from_attributes = True 
@@ -142,10 +211,36 @@ class TermCreate(BaseModel):
     category: Optional[str] = None
 
 class TermResponse(BaseModel):
-    id: int
+    id: str
     term: str
     description: str
     created_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class TermSuggestion(BaseModel):
+    id: str
+    term: str
+    description: Optional[str] = None
+    match: str
+    distance: int = 0
+
+# Review Schemas
+class ReviewAnswer(BaseModel):
+    session_id: str
+    kind: str
+    item_id: str
+    quality: int
+
+class ReviewStateResponse(BaseModel):
+    id: str
+    session_id: str
+    kind: str
+    item_id: str
+    ease: float
+    interval: int
+    repetitions: int
+    lapses: int = 0
+    due_at: datetime
+    last_reviewed_at: Optional[datetime] = None
@@ -0,0 +1,64 @@
+import asyncio
+import os
+from typing import Any, Callable, Dict, Hashable
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+# 공유 계산을 기다리는 최대 시간 (초), 넘으면 504
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', '30'))
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 요청이 진행 중인 계산 1건과 그 결과(또는 예외)를 공유
+
+    계산이 끝나면 키가 비워지므로 결과를 캐시하지는 않습니다.
+    동기 함수는 스레드풀에서, 코루틴 함수는 이벤트 루프에서 실행합니다.
+    """
+
+    def __init__(self, timeout: float = SINGLE_FLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.requests = 0
+        self.executions = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    async def _execute(self, func: Callable, *args) -> Any:
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args)
+        return await run_in_threadpool(func, *args)
+
+    def _finish(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled() and future.exception() is not None:
+            self.errors += 1
+
+    async def do(self, key: Hashable, func: Callable, *args) -> Any:
+        self.requests += 1
+        future = self._inflight.get(key)
+        if future is None:
+            self.executions += 1
+            future = asyncio.ensure_future(self._execute(func, *args))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        try:
+            # shield: 한 요청이 끊기거나 시간 초과돼도 공유 계산은 계속 진행
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise HTTPException(status_code=504, detail="Timed out waiting for shared result")
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "executions": self.executions,
+            "coalesced": self.requests - self.executions,
+            "coalescing_ratio": round(1 - self.executions / self.requests, 3) if self.requests else 0,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "in_flight": len(self._inflight)
+        }
+
+# 프로세스 전역 요청 합치기
+single_flight = SingleFlight()
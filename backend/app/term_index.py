@@ -0,0 +1,238 @@
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .firebase_db import get_collection
+
+# 한글 음절 분해용 상수
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+JUNGSEONG_JONGSEONG_COUNT = 21 * 28
+CHOSEONG = [
+    'ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ',
+    'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ'
+]
+CHOSEONG_SET = set(CHOSEONG)
+
+def normalize_term(text: str) -> str:
+    """검색 키 정규화 (소문자, 공백 제거)"""
+    return ''.join(text.lower().split())
+
+def to_choseong(text: str) -> str:
+    """한글 음절을 초성으로 변환 (그 외 문자는 그대로 유지)"""
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            chars.append(CHOSEONG[(code - HANGUL_BASE) // JUNGSEONG_JONGSEONG_COUNT])
+        else:
+            chars.append(ch)
+    return ''.join(chars)
+
+def levenshtein(a: str, b: str) -> int:
+    """편집 거리 계산"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        previous = current
+    return previous[-1]
+
+def _matches_query(query: str, name: str) -> bool:
+    """초성/음절이 섞인 질의가 용어의 접두어와 일치하는지 확인"""
+    if len(query) > len(name):
+        return False
+    for q, n in zip(query, name):
+        if q == n:
+            continue
+        if q in CHOSEONG_SET and to_choseong(n) == q:
+            continue
+        return False
+    return True
+
+class BKTree:
+    """편집 거리 기반 BK-트리"""
+
+    def __init__(self):
+        self.root: Optional[Tuple[str, Dict[int, tuple]]] = None
+
+    def add(self, word: str):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        if self.root is None:
+            return []
+        results = []
+        stack = [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= max_distance:
+                results.append((distance, node_word))
+            low, high = distance - max_distance, distance + max_distance
+            for child_distance, child in children.items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+        return sorted(results)
+
+class TermIndex:
+    """용어 자동완성 인덱스 (정렬 배열 + BK-트리)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._terms: Dict[str, dict] = {}
+        self._names: Dict[str, List[str]] = {}
+        self._choseong_keys: List[Tuple[str, str]] = []
+        self._bk_tree = BKTree()
+        # BK-트리는 삭제를 지원하지 않으므로 빠진 이름은 검색 시 걸러내고, 많아지면 트리를 다시 만듦
+        self._stale_names = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def _remove(self, term_id: str):
+        """기존 항목 제거 (같은 ID가 다른 이름으로 다시 들어올 때)"""
+        old = self._terms.pop(term_id, None)
+        if old is None:
+            return
+        name = normalize_term(old['term'])
+        ids = self._names.get(name, [])
+        if term_id in ids:
+            ids.remove(term_id)
+        if ids:
+            return
+        self._names.pop(name, None)
+        key = (to_choseong(name), name)
+        position = bisect.bisect_left(self._choseong_keys, key)
+        if position < len(self._choseong_keys) and self._choseong_keys[position] == key:
+            del self._choseong_keys[position]
+        self._stale_names += 1
+        if self._stale_names > len(self._names):
+            self._bk_tree = BKTree()
+            for remaining in self._names:
+                self._bk_tree.add(remaining)
+            self._stale_names = 0
+
+    def _insert(self, term_id: str, term: str, description: str = ''):
+        name = normalize_term(term)
+        old = self._terms.get(term_id)
+        if old is not None and normalize_term(old['term']) != name:
+            self._remove(term_id)
+        if not name:
+            return
+        self._terms[term_id] = {'id': term_id, 'term': term, 'description': description}
+        if name not in self._names:
+            self._names[name] = []
+            bisect.insort(self._choseong_keys, (to_choseong(name), name))
+            self._bk_tree.add(name)
+        ids = self._names[name]
+        if term_id not in ids:
+            ids.append(term_id)
+
+    def add(self, term_id: str, term: str, description: str = ''):
+        """용어 1건을 인덱스에 추가 (add_term에서 호출)"""
+        with self._lock:
+            self._insert(term_id, term, description)
+
+    def rebuild(self, terms: List[dict]):
+        """용어 목록으로 인덱스 전체 재구성"""
+        with self._lock:
+            self._terms = {}
+            self._names = {}
+            self._choseong_keys = []
+            self._bk_tree = BKTree()
+            self._stale_names = 0
+            for term in terms:
+                self._insert(term['id'], term.get('term', ''), term.get('description', ''))
+            self._loaded = True
+
+    def terms(self) -> List[dict]:
+        """인덱스에 들어 있는 모든 용어 반환"""
+        with self._lock:
+            return list(self._terms.values())
+
+    def _entries(self, name: str, match: str, distance: int = 0) -> List[dict]:
+        return [
+            {**self._terms[term_id], 'match': match, 'distance': distance}
+            for term_id in self._names.get(name, [])
+        ]
+
+    def search(self, query: str, limit: int = 10, fuzzy: bool = True,
+               max_distance: Optional[int] = None) -> List[dict]:
+        """접두어/초성 검색 후 부족하면 편집 거리 검색으로 보충"""
+        q = normalize_term(query)
+        if not q:
+            return []
+        key = to_choseong(q)
+        results = []
+        seen = set()
+        with self._lock:
+            start = bisect.bisect_left(self._choseong_keys, (key, ''))
+            for choseong_key, name in self._choseong_keys[start:]:
+                if not choseong_key.startswith(key):
+                    break
+                if name in seen or not _matches_query(q, name):
+                    continue
+                seen.add(name)
+                match = 'prefix' if name.startswith(q) else 'choseong'
+                results.extend(self._entries(name, match))
+                if len(results) >= limit:
+                    return results[:limit]
+
+            if fuzzy:
+                if max_distance is None:
+                    max_distance = 1 if len(q) <= 4 else 2
+                for distance, name in self._bk_tree.search(q, max_distance):
+                    if name in seen or name not in self._names:
+                        continue
+                    seen.add(name)
+                    results.extend(self._entries(name, 'fuzzy', distance))
+                    if len(results) >= limit:
+                        break
+        return results[:limit]
+
+    def load(self) -> bool:
+        """Firestore의 term 컬렉션으로 인덱스 구성"""
+        try:
+            term_collection = get_collection('term')
+            if not term_collection:
+                return False
+            terms = []
+            for doc in term_collection.stream():
+                term_data = doc.to_dict()
+                term_data['id'] = doc.id
+                terms.append(term_data)
+            self.rebuild(terms)
+            print(f"✅ 용어 인덱스 구성 완료: {len(terms)}개")
+            return True
+        except Exception as e:
+            print(f"❌ 용어 인덱스 구성 실패: {e}")
+            return False
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+# 프로세스 전역 용어 인덱스
+term_index = TermIndex()
@@ -0,0 +1,121 @@
+import threading
+from collections import deque
+from typing import Dict, List
+
+def _fold(text: str) -> str:
+    """길이를 유지하는 소문자 변환 (위치 계산이 원문과 어긋나지 않도록)"""
+    return ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+class AhoCorasick:
+    """용어 다중 패턴 매칭 오토마톤"""
+
+    def __init__(self, patterns: Dict[str, dict]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[str]] = [[]]
+        self.patterns = patterns
+        for pattern in patterns:
+            self._add(pattern)
+        self._build_failure_links()
+
+    def _add(self, pattern: str):
+        state = 0
+        for ch in pattern:
+            next_state = self.goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][ch] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                if self.fail[next_state] == next_state:
+                    self.fail[next_state] = 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find_all(self, text: str) -> List[tuple]:
+        """(시작, 끝, 패턴) 목록 반환"""
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for pattern in self.output[state]:
+                matches.append((i - len(pattern) + 1, i + 1, pattern))
+        return matches
+
+class TermLinker:
+    """AI 정보 본문에서 용어 위치를 찾아 주석을 붙이는 매처"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._automaton = AhoCorasick({})
+        self._built = False
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def rebuild(self, terms: List[dict]):
+        """용어 목록으로 오토마톤 재구성"""
+        patterns = {}
+        for term in terms:
+            name = (term.get('term') or '').strip()
+            if not name:
+                continue
+            patterns.setdefault(_fold(name), {'term': name, 'term_id': term.get('id')})
+        automaton = AhoCorasick(patterns)
+        with self._lock:
+            self._automaton = automaton
+            self._built = True
+
+    def annotate(self, content: str) -> List[dict]:
+        """본문에서 겹치지 않는 최장 일치 용어 구간 반환"""
+        if not content:
+            return []
+        with self._lock:
+            automaton = self._automaton
+        folded = _fold(content)
+        candidates = []
+        for start, end, pattern in automaton.find_all(folded):
+            # 영문/숫자 용어는 단어 중간에서 일치하지 않도록 경계 확인
+            if _is_word_char(pattern[0]) and start > 0 and _is_word_char(folded[start - 1]):
+                continue
+            if _is_word_char(pattern[-1]) and end < len(folded) and _is_word_char(folded[end]):
+                continue
+            candidates.append((start, -(end - start), end, pattern))
+        candidates.sort()
+
+        spans = []
+        last_end = 0
+        for start, _, end, pattern in candidates:
+            if start < last_end:
+                continue
+            info = automaton.patterns[pattern]
+            spans.append({
+                'term': info['term'],
+                'term_id': info['term_id'],
+                'start': start,
+                'end': end
+            })
+            last_end = end
+        return spans
+
+# 프로세스 전역 용어 매처
+term_linker = TermLinker()
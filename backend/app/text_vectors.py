@@ -0,0 +1,89 @@
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+N_FEATURES = 2 ** 18
+NGRAM_SIZES = (2, 3)
+# 문서의 절반 이상에 나오는 n-gram(조사, 어미 등)은 유사도 계산에서 제외
+MAX_DOC_FREQ = 0.5
+
+def normalize_text(text: str) -> str:
+    """벡터화용 정규화 (소문자, 구두점 제거, 공백 정리)"""
+    text = (text or '').lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def char_ngrams(text: str, sizes: Iterable[int] = NGRAM_SIZES) -> List[str]:
+    """단어별 문자 n-gram (한국어처럼 띄어쓰기 단위가 불규칙한 텍스트에도 동작)"""
+    grams = []
+    for word in normalize_text(text).split():
+        padded = f" {word} "
+        for size in sizes:
+            grams.extend(padded[i:i + size] for i in range(len(padded) - size + 1))
+    return grams
+
+@lru_cache(maxsize=200000)
+def _feature_index(gram: str, n_features: int) -> int:
+    # 프로세스마다 달라지는 hash() 대신 crc32를 써서 워커 간 동일한 인덱스 보장
+    return zlib.crc32(gram.encode('utf-8')) % n_features
+
+def hashed_counts(texts: List[str], n_features: int = N_FEATURES) -> sparse.csr_matrix:
+    """문서별 n-gram 빈도를 해시 특징 희소 행렬로 변환"""
+    rows, cols, data = [], [], []
+    for row, text in enumerate(texts):
+        for gram, count in Counter(char_ngrams(text)).items():
+            rows.append(row)
+            cols.append(_feature_index(gram, n_features))
+            data.append(count)
+    data = np.asarray(data, dtype=np.float32)
+    counts = sparse.csr_matrix((data, (rows, cols)), shape=(len(texts), n_features), dtype=np.float32)
+    counts.sum_duplicates()
+    return counts
+
+def idf_weights(counts: sparse.csr_matrix, max_doc_freq: float = MAX_DOC_FREQ) -> np.ndarray:
+    """평활화된 역문서빈도 (너무 흔한 특징은 0)"""
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+    if n_docs >= 10:
+        idf[df > max_doc_freq * n_docs] = 0.0
+    return idf
+
+def l2_normalize(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix, dtype=np.float32)
+
+def tfidf_matrix(texts: List[str], idf: Optional[np.ndarray] = None,
+                 n_features: int = N_FEATURES) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """L2 정규화된 TF-IDF 행렬과 사용한 idf 반환 (idf를 주면 그대로 사용)"""
+    counts = hashed_counts(texts, n_features)
+    counts.data = 1 + np.log(counts.data)
+    if idf is None:
+        idf = idf_weights(counts)
+    weighted = sparse.csr_matrix(counts @ sparse.diags(idf))
+    weighted.eliminate_zeros()
+    return l2_normalize(weighted), idf
+
+def top_k_rows(similarity: sparse.csr_matrix, k: int, exclude_diagonal: bool = True) -> List[List[Tuple[int, float]]]:
+    """희소 유사도 행렬의 행별 상위 k개 (열 번호, 점수)"""
+    similarity = similarity.tocsr()
+    neighbors = []
+    for row in range(similarity.shape[0]):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        cols = similarity.indices[start:end]
+        scores = similarity.data[start:end]
+        if exclude_diagonal:
+            mask = cols != row
+            cols, scores = cols[mask], scores[mask]
+        if len(scores) > k:
+            top = np.argpartition(-scores, k)[:k]
+            cols, scores = cols[top], scores[top]
+        order = np.argsort(-scores)
+        neighbors.append([(int(cols[i]), float(scores[i])) for i in order if scores[i] > 0])
+    return neighbors
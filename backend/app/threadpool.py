@@ -0,0 +1,149 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+import anyio
+from anyio import to_thread
+from fastapi import HTTPException
+
+# 동기 엔드포인트가 공유하는 스레드풀 크기 (anyio 기본값 40)
+THREADPOOL_SIZE = int(os.getenv('THREADPOOL_SIZE', '40'))
+# 라우트 그룹별 동시 실행 상한 (예: "admin=4,scan=8")
+DEFAULT_ROUTE_LIMITS = {'admin': 4, 'scan': 8}
+# 라우트 슬롯을 기다리는 최대 시간 (초), 넘으면 503
+ROUTE_QUEUE_TIMEOUT = float(os.getenv('ROUTE_QUEUE_TIMEOUT', '10'))
+SAMPLE_INTERVAL_SECONDS = 1.0
+
+def _parse_limits(value: Optional[str]) -> Dict[str, int]:
+    limits = dict(DEFAULT_ROUTE_LIMITS)
+    for part in (value or '').split(','):
+        name, _, capacity = part.partition('=')
+        if name.strip() and capacity.strip().isdigit():
+            limits[name.strip()] = int(capacity)
+    return limits
+
+ROUTE_LIMITS = _parse_limits(os.getenv('ROUTE_CONCURRENCY_LIMITS'))
+
+class RouteLimiter:
+    """비싼 라우트 그룹의 동시 실행 수 제한 (yield 의존성으로 사용)
+
+    슬롯을 얻은 뒤에 동기 핸들러가 스레드풀로 넘어가므로
+    관리자용 전체 스캔이 몰려도 공유 스레드를 capacity개 이상 점유하지 않습니다.
+    """
+
+    def __init__(self, name: str, capacity: int, timeout: float = ROUTE_QUEUE_TIMEOUT):
+        self.name = name
+        self.capacity = capacity
+        self.timeout = timeout
+        self._limiter = None
+        self.active = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _get_limiter(self) -> anyio.CapacityLimiter:
+        # CapacityLimiter는 이벤트 루프 안에서 생성해야 함
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.capacity)
+        return self._limiter
+
+    async def __call__(self):
+        limiter = self._get_limiter()
+        # 획득/반환 태스크가 달라도 되도록 요청별 토큰으로 빌림
+        token = object()
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            with anyio.fail_after(self.timeout):
+                await limiter.acquire_on_behalf_of(token)
+        except TimeoutError:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server is busy, please retry")
+        finally:
+            self.waiting -= 1
+
+        wait = time.perf_counter() - started
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            limiter.release_on_behalf_of(token)
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "active": self.active,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 2) if self.acquired else 0,
+            "max_wait_ms": round(self.max_wait * 1000, 2)
+        }
+
+_route_limiters: Dict[str, RouteLimiter] = {}
+
+def route_limit(name: str) -> RouteLimiter:
+    """라우트 그룹 이름으로 공유 리미터 반환 (Depends(route_limit('admin')))"""
+    if name not in _route_limiters:
+        _route_limiters[name] = RouteLimiter(name, ROUTE_LIMITS.get(name, THREADPOOL_SIZE))
+    return _route_limiters[name]
+
+class ThreadpoolMonitor:
+    """기본 스레드풀 사용량을 주기적으로 표본 추출해 포화도 기록"""
+
+    def __init__(self):
+        self.samples = 0
+        self.saturated_samples = 0
+        self.peak_active = 0
+        self.peak_waiting = 0
+        self._task = None
+
+    def configure(self):
+        limiter = to_thread.current_default_thread_limiter()
+        limiter.total_tokens = THREADPOOL_SIZE
+        print(f"✅ 스레드풀 크기 설정: {THREADPOOL_SIZE}")
+
+    def sample(self):
+        stats = to_thread.current_default_thread_limiter().statistics()
+        self.samples += 1
+        self.peak_active = max(self.peak_active, stats.borrowed_tokens)
+        self.peak_waiting = max(self.peak_waiting, stats.tasks_waiting)
+        if stats.borrowed_tokens >= stats.total_tokens:
+            self.saturated_samples += 1
+        return stats
+
+    async def run(self):
+        while True:
+            self.sample()
+            await anyio.sleep(SAMPLE_INTERVAL_SECONDS)
+
+    def start(self):
+        """스레드풀 크기 적용 후 표본 추출 태스크 시작 (시작 이벤트에서 호출)"""
+        self.configure()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    def stats(self) -> dict:
+        current = to_thread.current_default_thread_limiter().statistics()
+        return {
+            "threadpool": {
+                "capacity": current.total_tokens,
+                "active_threads": current.borrowed_tokens,
+                "waiting_tasks": current.tasks_waiting,
+                "saturation": round(current.borrowed_tokens / current.total_tokens, 3) if current.total_tokens else 0,
+                "peak_active_threads": self.peak_active,
+                "peak_waiting_tasks": self.peak_waiting,
+                "saturated_ratio": round(self.saturated_samples / self.samples, 3) if self.samples else 0
+            },
+            "routes": {name: limiter.stats() for name, limiter in _route_limiters.items()}
+        }
+
+# 프로세스 전역 스레드풀 모니터
+threadpool_monitor = ThreadpoolMonitor()
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# 실패한 쓰기를 다시 시도하는 최대 횟수와 최대 대기 시간 (초)
+MAX_RETRIES = 5
+MAX_RETRY_DELAY = 60.0
+
+class WriteCoalescer:
+    """같은 키로 짧은 시간 안에 들어온 쓰기를 합쳐 한 번만 저장 (디바운스)
+
+    submit으로 들어온 값은 merge 함수로 대기 중인 값과 합쳐지고,
+    첫 요청 후 delay초가 지나면 flush 함수가 한 번 호출됩니다.
+    flush가 실패하면 그사이 들어온 값과 합쳐 지수 백오프로 다시 시도하고,
+    MAX_RETRIES번 넘게 실패하면 버리고 dropped로 집계합니다.
+
+    대기 값은 이 워커의 메모리에만 있으므로 정상 종료 시 flush_all로 저장되지만,
+    프로세스가 강제 종료되면 최대 delay초(재시도 중이면 그 이상) 분량이 유실될 수 있습니다.
+    합치기도 워커 단위라서 여러 워커에 나뉜 같은 키의 쓰기는 워커 수만큼 기록됩니다.
+    """
+
+    def __init__(self, flush: Callable[[Hashable, Any], None],
+                 merge: Callable[[Any, Any], Any], delay: float = 2.0,
+                 max_retries: int = MAX_RETRIES):
+        self._flush = flush
+        self._merge = merge
+        self.delay = delay
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, Any] = {}
+        self._timers: Dict[Hashable, threading.Timer] = {}
+        self._attempts: Dict[Hashable, int] = {}
+        self.submitted = 0
+        self.flushed = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+
+    def _schedule(self, key: Hashable, delay: float):
+        """잠금 안에서 호출"""
+        timer = threading.Timer(delay, self._run, args=(key,))
+        timer.daemon = True
+        self._timers[key] = timer
+        timer.start()
+
+    def submit(self, key: Hashable, value: Any) -> Any:
+        """대기 중인 값과 합친 결과 반환 (아직 저장되지 않은 값)"""
+        with self._lock:
+            self.submitted += 1
+            if key in self._pending:
+                value = self._merge(self._pending[key], value)
+            self._pending[key] = value
+            if key not in self._timers:
+                self._schedule(key, self.delay)
+            return value
+
+    def _run(self, key: Hashable, retry: bool = True):
+        with self._lock:
+            value = self._pending.pop(key, None)
+            self._timers.pop(key, None)
+        if value is None:
+            return
+        try:
+            self._flush(key, value)
+        except Exception as e:
+            self._failed(key, value, e, retry)
+            return
+        with self._lock:
+            self.flushed += 1
+            self._attempts.pop(key, None)
+
+    def _failed(self, key: Hashable, value: Any, error: Exception, retry: bool):
+        with self._lock:
+            self.failures += 1
+            self.last_error = f"{key}: {error}"
+            self.last_error_at = time.time()
+            attempts = self._attempts.get(key, 0) + 1
+            if not retry or attempts > self.max_retries:
+                self._attempts.pop(key, None)
+                self.dropped += 1
+                print(f"❌ 지연 쓰기 포기 ({key}, {attempts}회 실패): {error}")
+                return
+            self._attempts[key] = attempts
+            # 실패한 값 위에 그사이 들어온 값을 합쳐 다시 대기
+            if key in self._pending:
+                self._pending[key] = self._merge(value, self._pending[key])
+            else:
+                self._pending[key] = value
+            retry_delay = min(self.delay * 2 ** attempts, MAX_RETRY_DELAY)
+            if key in self._timers:
+                self._timers[key].cancel()
+            self._schedule(key, retry_delay)
+        print(f"⚠️ 지연 쓰기 실패 ({key}), {retry_delay:.1f}초 후 재시도 {attempts}/{self.max_retries}: {error}")
+
+    def flush_all(self):
+        """대기 중인 쓰기를 즉시 모두 저장 (종료 시 호출, 실패한 값은 재시도 없이 dropped로 집계)"""
+        with self._lock:
+            keys = list(self._pending)
+            for key in keys:
+                timer = self._timers.get(key)
+                if timer:
+                    timer.cancel()
+        for key in keys:
+            self._run(key, retry=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "flushed": self.flushed,
+                "pending": len(self._pending),
+                "retrying": len(self._attempts),
+                "failures": self.failures,
+                "dropped": self.dropped,
+                "last_error": self.last_error,
+                "seconds_since_last_error": round(time.time() - self.last_error_at, 1) if self.last_error_at else None
+            }
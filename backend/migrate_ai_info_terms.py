@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+ai_info 용어 필드 마이그레이션 스크립트
+JSON 문자열로 저장된 info1_terms..info3_terms를 Firestore 네이티브 배열로 변환합니다.
+중단되더라도 체크포인트 파일에 기록된 마지막 문서부터 다시 시작합니다.
+"""
+
+import os
+import sys
+import argparse
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.firebase_db import get_firestore_client
+from app.firebase_models import decode_terms
+
+TERM_FIELDS = ['info1_terms', 'info2_terms', 'info3_terms']
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.migrate_ai_info_terms.checkpoint')
+
+def read_checkpoint(path: str):
+    """마지막으로 처리한 문서 ID 읽기"""
+    if os.path.exists(path):
+        with open(path) as f:
+            return f.read().strip() or None
+    return None
+
+def write_checkpoint(path: str, doc_id: str):
+    """처리한 문서 ID를 원자적으로 기록"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(doc_id)
+    os.replace(tmp_path, path)
+
+def migrate_ai_info_terms(batch_size: int = 200, checkpoint_path: str = DEFAULT_CHECKPOINT, dry_run: bool = False):
+    """문서 ID 순서로 페이지를 읽어 배치 단위로 변환"""
+    db = get_firestore_client()
+    if not db:
+        print("❌ Firestore 클라이언트를 가져올 수 없습니다")
+        return False
+
+    collection = db.collection('ai_info')
+    last_id = read_checkpoint(checkpoint_path)
+    if last_id:
+        print(f"🔄 체크포인트에서 재개: {last_id}")
+
+    scanned = 0
+    migrated = 0
+    while True:
+        query = collection.order_by('__name__').limit(batch_size)
+        if last_id:
+            query = query.start_after({'__name__': collection.document(last_id)})
+        docs = list(query.stream())
+        if not docs:
+            break
+
+        batch = db.batch()
+        pending = 0
+        for doc in docs:
+            data = doc.to_dict()
+            updates = {
+                field: decode_terms(data.get(field))
+                for field in TERM_FIELDS
+                if isinstance(data.get(field), str) or (field in data and data.get(field) is None)
+            }
+            if updates:
+                batch.update(doc.reference, updates)
+                pending += 1
+
+        if pending and not dry_run:
+            batch.commit()
+
+        scanned += len(docs)
+        migrated += pending
+        last_id = docs[-1].id
+        if not dry_run:
+            write_checkpoint(checkpoint_path, last_id)
+        print(f"📦 {scanned}개 확인, {migrated}개 변환 (마지막 문서: {last_id})")
+
+    if not dry_run and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"✅ 마이그레이션 완료: {scanned}개 중 {migrated}개 변환")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ai_info 용어 필드를 네이티브 배열로 변환")
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    success = migrate_ai_info_terms(args.batch_size, args.checkpoint, args.dry_run)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+quiz random_key 백필 스크립트
+random_key가 없는 기존 퀴즈 문서에 균등 분포 난수를 채워 랜덤 표본 추출 인덱스에 포함시킵니다.
+(topic ASC, random_key ASC 복합 인덱스가 필요합니다)
+"""
+
+import os
+import sys
+import random
+import argparse
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.firebase_db import get_firestore_client
+from migrate_ai_info_terms import read_checkpoint, write_checkpoint
+
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.migrate_quiz_random_keys.checkpoint')
+
+def backfill_random_keys(batch_size: int = 400, checkpoint_path: str = DEFAULT_CHECKPOINT):
+    """문서 ID 순서로 페이지를 읽어 random_key가 없는 문서만 갱신"""
+    db = get_firestore_client()
+    if not db:
+        print("❌ Firestore 클라이언트를 가져올 수 없습니다")
+        return False
+
+    collection = db.collection('quiz')
+    last_id = read_checkpoint(checkpoint_path)
+    if last_id:
+        print(f"🔄 체크포인트에서 재개: {last_id}")
+
+    scanned = 0
+    updated = 0
+    while True:
+        query = collection.order_by('__name__').limit(batch_size)
+        if last_id:
+            query = query.start_after({'__name__': collection.document(last_id)})
+        docs = list(query.stream())
+        if not docs:
+            break
+
+        batch = db.batch()
+        pending = 0
+        for doc in docs:
+            if doc.to_dict().get('random_key') is None:
+                batch.update(doc.reference, {'random_key': random.random()})
+                pending += 1
+        if pending:
+            batch.commit()
+
+        scanned += len(docs)
+        updated += pending
+        last_id = docs[-1].id
+        write_checkpoint(checkpoint_path, last_id)
+        print(f"📦 {scanned}개 확인, {updated}개 갱신")
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"✅ 백필 완료: {scanned}개 중 {updated}개 갱신")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="quiz 문서에 random_key 백필")
+    parser.add_argument('--batch-size', type=int, default=400)
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    args = parser.parse_args()
+
+    success = backfill_random_keys(args.batch_size, args.checkpoint)
+    sys.exit(0 if success else 1)
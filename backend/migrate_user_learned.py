@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+user_learned 비트셋 백필 스크립트
+기존 user_progress 문서의 learned_info를 세션별 user_learned/{session_id} 날짜 비트셋에 합집합으로 반영합니다.
+합집합이므로 여러 번 실행해도 결과가 같고, 중단되면 체크포인트의 마지막 문서부터 다시 시작합니다.
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+from firebase_admin import firestore
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.firebase_db import get_firestore_client
+from app.learned_set import LearnedSet, MAX_ITEMS_PER_DATE
+from migrate_ai_info_terms import read_checkpoint, write_checkpoint
+
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.migrate_user_learned.checkpoint')
+
+def parse_learned_info(value):
+    """learned_info (이전 형식은 JSON 문자열) → 범위 안의 항목 번호 목록"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    if not isinstance(value, list):
+        return []
+    return [index for index in value if type(index) is int and 0 <= index < MAX_ITEMS_PER_DATE]
+
+def merge_learned(db, session_id: str, addition: LearnedSet):
+    """세션 비트셋에 합집합 반영 (실행 중인 서버의 쓰기와 겹치지 않도록 트랜잭션)"""
+    learned_ref = db.collection('user_learned').document(session_id)
+
+    @firestore.transactional
+    def merge(transaction):
+        snapshot = learned_ref.get(transaction=transaction)
+        current = LearnedSet.from_dict(snapshot.to_dict().get('bits')) if snapshot.exists else LearnedSet()
+        merged = current | addition
+        if snapshot.exists and merged == current:
+            return
+        transaction.set(learned_ref, {
+            'session_id': session_id,
+            'bits': merged.to_dict(),
+            'count': len(merged),
+            'updated_at': datetime.now().isoformat()
+        })
+
+    merge(db.transaction())
+
+def backfill_user_learned(batch_size: int = 300, checkpoint_path: str = DEFAULT_CHECKPOINT):
+    """문서 ID 순서로 진행 문서를 읽어 페이지마다 세션별로 모아 반영"""
+    db = get_firestore_client()
+    if not db:
+        print("❌ Firestore 클라이언트를 가져올 수 없습니다")
+        return False
+
+    collection = db.collection('user_progress')
+    last_id = read_checkpoint(checkpoint_path)
+    if last_id:
+        print(f"🔄 체크포인트에서 재개: {last_id}")
+
+    scanned = 0
+    sessions = set()
+    while True:
+        query = collection.order_by('__name__').select(['session_id', 'date', 'learned_info']).limit(batch_size)
+        if last_id:
+            query = query.start_after({'__name__': collection.document(last_id)})
+        docs = list(query.stream())
+        if not docs:
+            break
+
+        additions = {}
+        for doc in docs:
+            data = doc.to_dict()
+            session_id, date = data.get('session_id'), data.get('date')
+            indices = parse_learned_info(data.get('learned_info'))
+            if not session_id or not date or not indices:
+                continue
+            additions[session_id] = additions.get(session_id, LearnedSet()) | LearnedSet.from_indices(date, indices)
+
+        for session_id, addition in additions.items():
+            merge_learned(db, session_id, addition)
+
+        scanned += len(docs)
+        sessions.update(additions)
+        last_id = docs[-1].id
+        write_checkpoint(checkpoint_path, last_id)
+        print(f"📦 {scanned}개 확인, {len(sessions)}개 세션 반영")
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"✅ 백필 완료: 진행 문서 {scanned}개, 세션 {len(sessions)}개")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="user_progress의 학습 항목을 user_learned 비트셋으로 백필")
+    parser.add_argument('--batch-size', type=int, default=300)
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    args = parser.parse_args()
+
+    success = backfill_user_learned(args.batch_size, args.checkpoint)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,48 @@
+import bisect
+import random
+
+from app.leaderboard import Board, IndexableSkipList, entry_doc_id, period_keys
+
+def test_skip_list_matches_sorted_list():
+    rng = random.Random(7)
+    skip_list = IndexableSkipList()
+    expected = []
+    for _ in range(2000):
+        key = (rng.randint(0, 200), rng.choice('abc'))
+        if key in expected and rng.random() < 0.5:
+            assert skip_list.remove(key)
+            expected.remove(key)
+        elif key not in expected:
+            skip_list.insert(key)
+            bisect.insort(expected, key)
+    assert len(skip_list) == len(expected)
+    assert skip_list.slice(0, len(expected)) == expected
+    for position, key in enumerate(expected[:50]):
+        assert skip_list.rank(key) == position
+        assert skip_list.count_less(key) == position
+        assert skip_list.slice(position, 3) == expected[position:position + 3]
+    assert skip_list.rank((-1, 'x')) is None
+    assert not skip_list.remove((-1, 'x'))
+    assert skip_list.slice(len(expected), 1) == []
+
+def test_board_ranks_ties_together():
+    board = Board({'a': 30, 'b': 50, 'c': 30, 'd': 10}, total=10)
+    assert board.top(3) == [
+        {'rank': 1, 'session_id': 'b', 'score': 50},
+        {'rank': 2, 'session_id': 'a', 'score': 30},
+        {'rank': 2, 'session_id': 'c', 'score': 30},
+    ]
+    assert board.position('d') == {'rank': 4, 'session_id': 'd', 'score': 10, 'total': 10}
+    assert board.position('missing') is None
+    assert board.rank(40) == 2
+
+def test_board_add_score_moves_entry():
+    board = Board({'a': 30, 'b': 50})
+    board.add_score('a', 25)
+    board.add_score('e', 5)
+    assert [row['session_id'] for row in board.top(10)] == ['a', 'b', 'e']
+    assert len(board.ranking) == 3
+
+def test_period_keys_and_doc_id():
+    assert period_keys('2024-01-01') == {'daily': 'daily_2024-01-01', 'weekly': 'weekly_2024-W01', 'all': 'all'}
+    assert entry_doc_id('all', 's1') == 'all_s1'
@@ -0,0 +1,51 @@
+import math
+
+from google.cloud.firestore_v1.transforms import Increment
+
+from app.quiz_stats import build_stats_update, item_statistics, point_biserial
+
+def _value(transform):
+    assert isinstance(transform, Increment)
+    return transform.value
+
+def test_build_stats_update_without_rest_score():
+    update = build_stats_update(2, True, None)
+    assert set(update) == {'attempts', 'correct', 'choices'}
+    assert (_value(update['attempts']), _value(update['correct'])) == (1, 1)
+    assert _value(update['choices']['2']) == 1
+
+def test_build_stats_update_with_rest_score():
+    update = build_stats_update(0, False, 0.5)
+    assert _value(update['correct']) == 0
+    assert _value(update['scored_attempts']) == 1
+    assert _value(update['sum_rest']) == 0.5
+    assert _value(update['sum_rest_sq']) == 0.25
+    assert _value(update['sum_rest_correct']) == 0.0
+
+def test_point_biserial_matches_direct_formula():
+    rest = [0.9, 0.8, 0.7, 0.3, 0.2, 0.6]
+    correct = [True, True, False, False, False, True]
+    value = point_biserial(
+        len(rest), sum(correct), sum(rest), sum(x * x for x in rest),
+        sum(x for x, c in zip(rest, correct) if c)
+    )
+    n = len(rest)
+    mean = sum(rest) / n
+    std = math.sqrt(sum((x - mean) ** 2 for x in rest) / n)
+    mean_1 = sum(x for x, c in zip(rest, correct) if c) / 3
+    mean_0 = sum(x for x, c in zip(rest, correct) if not c) / 3
+    assert math.isclose(value, (mean_1 - mean_0) / std * math.sqrt(0.25))
+
+def test_point_biserial_undefined_cases():
+    assert point_biserial(1, 1, 0.5, 0.25, 0.5) is None
+    assert point_biserial(3, 3, 1.5, 0.9, 1.5) is None
+    assert point_biserial(2, 1, 1.0, 0.5, 0.5) is None
+
+def test_item_statistics():
+    stats = item_statistics('q1', {'topic': 'AI', 'attempts': 4, 'correct': 3, 'choices': {'1': 3, '0': 1}})
+    assert stats == {
+        'quiz_id': 'q1', 'topic': 'AI', 'attempts': 4, 'correct_rate': 0.75,
+        'choice_distribution': {'0': 0.25, '1': 0.75}, 'discrimination': None
+    }
+    empty = item_statistics('q2', {})
+    assert empty['correct_rate'] is None and empty['choice_distribution'] == {}
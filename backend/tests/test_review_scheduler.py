@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta, timezone
+
+from app.review_scheduler import DEFAULT_EASE, MIN_EASE, review_doc_id, sm2
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def test_review_doc_id():
+    assert review_doc_id('s1', 'term', 't9') == 's1__term__t9'
+
+def test_first_reviews_follow_fixed_intervals():
+    state = sm2(None, 4, NOW)
+    assert (state['interval'], state['repetitions'], state['ease']) == (1, 1, DEFAULT_EASE)
+    assert state['due_at'] == NOW + timedelta(days=1)
+    state = sm2(state, 4, NOW)
+    assert (state['interval'], state['repetitions']) == (6, 2)
+    state = sm2(state, 5, NOW)
+    assert state['interval'] == round(6 * DEFAULT_EASE)
+    assert state['ease'] == DEFAULT_EASE + 0.1
+
+def test_failed_review_resets_and_counts_lapse():
+    state = sm2({'ease': 2.5, 'interval': 15, 'repetitions': 3, 'lapses': 1}, 2, NOW)
+    assert (state['interval'], state['repetitions'], state['lapses']) == (1, 0, 2)
+    assert state['ease'] == 2.18
+    assert state['last_quality'] == 2 and state['last_reviewed_at'] == NOW
+
+def test_ease_never_drops_below_minimum():
+    state = None
+    for _ in range(10):
+        state = sm2(state, 0, NOW)
+    assert state['ease'] == MIN_EASE
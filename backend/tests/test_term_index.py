@@ -0,0 +1,60 @@
+from app.term_index import BKTree, TermIndex, levenshtein, normalize_term, to_choseong
+
+def _names(results):
+    return [result['term'] for result in results]
+
+def test_normalize_and_choseong():
+    assert normalize_term(' Deep  Learning ') == 'deeplearning'
+    assert to_choseong('인공지능') == 'ㅇㄱㅈㄴ'
+    assert to_choseong('AI모델') == 'AIㅁㄷ'
+
+def test_levenshtein():
+    assert levenshtein('kitten', 'sitting') == 3
+    assert levenshtein('', 'abc') == 3
+    assert levenshtein('same', 'same') == 0
+
+def test_bk_tree_search():
+    tree = BKTree()
+    for word in ['book', 'books', 'cake', 'boo', 'cape']:
+        tree.add(word)
+    assert tree.search('bool', 1) == [(1, 'boo'), (1, 'book')]
+
+def test_prefix_choseong_and_fuzzy_search():
+    index = TermIndex()
+    index.rebuild([
+        {'id': '1', 'term': '인공지능'},
+        {'id': '2', 'term': '인공신경망'},
+        {'id': '3', 'term': 'transformer'},
+    ])
+    assert _names(index.search('인공')) == ['인공신경망', '인공지능']
+    assert _names(index.search('ㅇㄱㅈ')) == ['인공지능']
+    assert _names(index.search('인ㄱ신')) == ['인공신경망']
+    fuzzy = index.search('transfomer')
+    assert fuzzy[0]['term'] == 'transformer' and fuzzy[0]['match'] == 'fuzzy'
+
+def test_reinsert_under_new_name_drops_old_entry():
+    index = TermIndex()
+    index.rebuild([{'id': '1', 'term': 'token'}])
+    index.add('1', 'embedding')
+    assert index.search('token') == []
+    assert index.search('tokem') == []
+    assert _names(index.search('embed')) == ['embedding']
+    assert index._choseong_keys == [('embedding', 'embedding')]
+    assert len(index.terms()) == 1
+
+def test_reinsert_same_name_keeps_single_key():
+    index = TermIndex()
+    index.add('1', 'token')
+    index.add('1', 'Token', 'updated')
+    index.add('2', 'token')
+    assert index._choseong_keys == [('token', 'token')]
+    assert [result['id'] for result in index.search('token')] == ['1', '2']
+    assert index.search('token')[0]['description'] == 'updated'
+
+def test_renamed_name_can_be_added_back():
+    index = TermIndex()
+    index.add('1', 'token')
+    index.add('1', 'vector')
+    index.add('2', 'token')
+    assert [result['id'] for result in index.search('token')] == ['2']
+    assert [result['id'] for result in index.search('tokem')] == ['2']
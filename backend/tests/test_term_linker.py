@@ -0,0 +1,35 @@
+from app.term_linker import AhoCorasick, TermLinker
+
+def _linker(*names):
+    linker = TermLinker()
+    linker.rebuild([{'id': str(i), 'term': name} for i, name in enumerate(names)])
+    return linker
+
+def test_find_all_reports_overlapping_patterns():
+    automaton = AhoCorasick({'he': {}, 'she': {}, 'hers': {}})
+    assert sorted(automaton.find_all('ushers')) == [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+
+def test_annotate_prefers_longest_match():
+    linker = _linker('언어', '언어 모델', '모델')
+    spans = linker.annotate('대규모 언어 모델을 학습')
+    assert [(span['term'], span['start'], span['end']) for span in spans] == [('언어 모델', 4, 9)]
+
+def test_annotate_is_case_insensitive_and_keeps_offsets():
+    linker = _linker('GPT')
+    content = 'New gpt release'
+    spans = linker.annotate(content)
+    assert spans == [{'term': 'GPT', 'term_id': '0', 'start': 4, 'end': 7}]
+    assert content[spans[0]['start']:spans[0]['end']] == 'gpt'
+
+def test_annotate_respects_word_boundaries_for_ascii_terms():
+    linker = _linker('AI', '모델')
+    assert linker.annotate('MAIL server') == []
+    assert [span['term'] for span in linker.annotate('AI모델')] == ['AI', '모델']
+
+def test_rebuild_skips_blank_terms_and_duplicate_names():
+    linker = TermLinker()
+    assert not linker.built
+    linker.rebuild([{'id': '1', 'term': 'Token'}, {'id': '2', 'term': 'token'}, {'id': '3', 'term': '  '}])
+    assert linker.built
+    assert linker.annotate('token') == [{'term': 'Token', 'term_id': '1', 'start': 0, 'end': 5}]
+    assert linker.annotate('') == []